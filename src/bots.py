@@ -0,0 +1,64 @@
+import importlib
+
+from src.snake import Snake
+from src.world import Policy, World
+
+__all__ = ["POLICIES", "greedy_policy", "random_policy", "resolve_policy"]
+
+DIRECTIONS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+
+
+def _distance(world: World, a, b):
+  """Manhattan distance on the wrapping map."""
+  dx = abs(a[0] - b[0])
+  dy = abs(a[1] - b[1])
+  return min(dx, world.map.width - dx) + min(dy, world.map.height - dy)
+
+
+def _safe_moves(world: World, snake: Snake):
+  """Yields ``(direction, cell)`` for every non-reversing move onto a free cell."""
+  head = snake.get_head()
+  dx, dy = snake.direction
+  for direction in DIRECTIONS:
+    if direction == (-dx, -dy) and len(snake.body) > 1:
+      continue
+    cell, _ = world.map.next_cell(head, direction)
+    if not world.map.is_blocked(*cell) and world.grid.is_free(cell):
+      yield direction, cell
+
+
+def greedy_policy(world: World, snake: Snake):
+  """Steers towards the nearest reachable food, only ever taking moves onto free cells."""
+  components = world.map.components
+  own = components.component_at(*snake.get_head())
+  foods = [food for food in world.foods if components.component_at(*food) == own]
+
+  best = None
+  best_distance = None
+  for direction, cell in _safe_moves(world, snake):
+    distance = min((_distance(world, cell, food) for food in foods), default=0)
+    if best_distance is None or distance < best_distance:
+      best, best_distance = direction, distance
+  return best
+
+
+def random_policy(world: World, snake: Snake):
+  """Wanders randomly, but never onto an occupied or blocked cell."""
+  moves = [direction for direction, _ in _safe_moves(world, snake)]
+  return world.rng.choice(moves) if moves else None
+
+
+POLICIES: dict[str, Policy] = {
+  "greedy": greedy_policy,
+  "random": random_policy,
+}
+
+
+def resolve_policy(name: str) -> Policy:
+  """Looks up a policy by its registered name or a ``module:function`` path."""
+  if name in POLICIES:
+    return POLICIES[name]
+  module_name, sep, attr = name.partition(":")
+  if not sep:
+    raise ValueError(f"Unknown bot policy '{name}'. Known policies: {', '.join(POLICIES)}.")
+  return getattr(importlib.import_module(module_name), attr)
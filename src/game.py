@@ -2,7 +2,10 @@ import sys
 
 import pygame
 
+from src import metrics
+from src.image_cache import ImageCache
 from src.states import MenuState
+from src.telemetry import TelemetryWriter
 from src.utils import load_config
 
 
@@ -21,10 +24,37 @@ class Game:
     self.clock = pygame.time.Clock()
     self.font = pygame.font.SysFont("Arial", 24)
 
+    self.image_cache = ImageCache(
+      self.config.cache.directory if self.config.cache.enabled else None, self.config.cache.max_entries
+    )
+
+    self.telemetry = None
+    if self.config.telemetry.enabled:
+      settings = self.config.telemetry
+      self.telemetry = TelemetryWriter(
+        settings.directory,
+        queue_size=settings.queue_size,
+        batch_size=settings.batch_size,
+        max_bytes=settings.max_bytes,
+        max_files=settings.max_files,
+        drop_policy=settings.drop_policy,
+      )
+
+    self.metrics_server = None
+    if self.config.metrics.enabled:
+      settings = self.config.metrics
+      try:
+        self.metrics_server = metrics.MetricsServer(settings.host, settings.port, settings.unix_socket)
+      except OSError as e:
+        print(f"Error starting metrics endpoint: {e}")
+
     self.running = True
     self.state = MenuState(self, self.config)
 
   def change_state(self, new_state):
+    on_exit = getattr(self.state, "on_exit", None)
+    if on_exit:
+      on_exit()
     self.state = new_state
 
   def run(self):
@@ -41,5 +71,19 @@ class Game:
       pygame.display.flip()
       self.clock.tick(self.config.game.speed)  # type: ignore
 
+      # get_rawtime is the time this frame took before tick() waited.
+      frame_seconds = self.clock.get_rawtime() / 1000
+      metrics.FRAME_SECONDS.observe(frame_seconds)
+      if frame_seconds > 1 / self.config.game.speed:
+        metrics.FRAME_OVERRUNS.inc()
+
+    on_exit = getattr(self.state, "on_exit", None)
+    if on_exit:
+      on_exit()
+    if self.telemetry:
+      self.telemetry.close()
+    if self.metrics_server:
+      self.metrics_server.stop()
+
     pygame.quit()
     sys.exit()
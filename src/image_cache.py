@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import hashlib
+import mmap
+import os
+import struct
+from collections.abc import Callable
+from pathlib import Path
+
+import pygame
+
+__all__ = ["ImageCache"]
+
+# Header of a cache entry: magic, width, height, pixel format (padded).
+_HEADER = struct.Struct("<4sII4s")
+_MAGIC = b"SNKI"
+
+
+class ImageCache:
+  """On-disk cache of decoded and already transformed images.
+
+  Entries hold raw pixel buffers keyed by the hash of the source file, a
+  description of the transform (e.g. the target size) and the pixel format.
+  A hit memory-maps the entry and hands it to ``pygame.image.frombuffer``,
+  skipping both PNG decoding and scaling. With *directory* set to *None* the
+  cache is disabled and every load decodes and transforms as usual.
+
+  Only the *max_entries* most recently used entries are kept, so edited
+  images and old window sizes do not pile up on disk.
+  """
+
+  def __init__(self, directory: str | Path | None, max_entries: int = 128):
+    self._directory = Path(directory) if directory is not None else None
+    self._max_entries = max_entries
+    # (path, mtime, size) -> digest, so unchanged files are only hashed once.
+    self._digests: dict[tuple[str, int, int], str] = {}
+    if self._directory is not None:
+      try:
+        self._directory.mkdir(parents=True, exist_ok=True)
+      except OSError as e:
+        self._disable(e)
+
+  def _disable(self, error: OSError):
+    """Falls back to uncached loading after the cache directory turned out to be unusable."""
+    print(f"Warning: image cache disabled: {error}")
+    self._directory = None
+
+  def load(
+    self,
+    path: str | Path,
+    transform_key: str,
+    transform: Callable[[pygame.Surface], pygame.Surface],
+    alpha: bool = False,
+  ) -> pygame.Surface:
+    """Loads *path*, applies *transform* and converts it for fast blitting.
+
+    *transform_key* must uniquely describe *transform*, e.g. ``"scale:720x640"``.
+    """
+    fmt = "RGBA" if alpha else "RGB"
+    entry = self._entry_path(path, transform_key, fmt)
+
+    if entry is not None:
+      surface = self._read(entry, fmt)
+      if surface is not None:
+        return surface.convert_alpha() if alpha else surface.convert()
+
+    image = pygame.image.load(path)
+    image = image.convert_alpha() if alpha else image.convert()
+    surface = transform(image)
+
+    # Reading the entry may have disabled the cache.
+    if entry is not None and self._directory is not None:
+      self._write(entry, surface, fmt)
+      self._prune()
+    return surface
+
+  def load_scaled(self, path: str | Path, size: tuple[int, int]) -> pygame.Surface:
+    """Loads an opaque image stretched to *size*."""
+    return self.load(path, f"scale:{size[0]}x{size[1]}", lambda image: pygame.transform.scale(image, size))
+
+  def _entry_path(self, path, transform_key: str, fmt: str) -> Path | None:
+    if self._directory is None:
+      return None
+
+    try:
+      stat = os.stat(path)
+      stamp = (str(path), stat.st_mtime_ns, stat.st_size)
+      digest = self._digests.get(stamp)
+      if digest is None:
+        with open(path, "rb") as file:
+          digest = hashlib.sha256(file.read()).hexdigest()
+        self._digests[stamp] = digest
+    except OSError:
+      # Let the uncached load report the unreadable source file.
+      return None
+
+    key = hashlib.sha256(f"{digest}|{transform_key}|{fmt}".encode()).hexdigest()
+    return self._directory / f"{key}.raw"
+
+  def _read(self, entry: Path, fmt: str) -> pygame.Surface | None:
+    try:
+      with open(entry, "rb") as file:
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (FileNotFoundError, ValueError):
+      # Missing, or empty (which mmap refuses).
+      return None
+    except OSError as e:
+      self._disable(e)
+      return None
+
+    if len(buffer) < _HEADER.size:
+      return None
+    magic, width, height, stored_fmt = _HEADER.unpack_from(buffer)
+    if magic != _MAGIC or stored_fmt.rstrip(b"\0").decode() != fmt:
+      return None
+    if len(buffer) != _HEADER.size + width * height * len(fmt):
+      # Truncated by an interrupted write; it is rewritten on this load.
+      return None
+
+    # Mark the entry as recently used so pruning keeps it.
+    try:
+      os.utime(entry)
+    except OSError:
+      pass
+
+    # The surface keeps the mapping alive until it is converted and dropped.
+    return pygame.image.frombuffer(memoryview(buffer)[_HEADER.size :], (width, height), fmt)
+
+  def _write(self, entry: Path, surface: pygame.Surface, fmt: str):
+    width, height = surface.get_size()
+    tmp = entry.with_suffix(f".{os.getpid()}.tmp")
+    try:
+      with open(tmp, "wb") as file:
+        file.write(_HEADER.pack(_MAGIC, width, height, fmt.encode()))
+        file.write(pygame.image.tobytes(surface, fmt))
+      os.replace(tmp, entry)
+    except OSError as e:
+      print(f"Warning: could not write image cache entry: {e}")
+      try:
+        tmp.unlink()
+      except OSError:
+        pass
+
+  def _prune(self):
+    entries = []
+    for entry in self._directory.glob("*.raw"):
+      try:
+        entries.append((entry.stat().st_mtime_ns, entry))
+      except OSError:
+        pass
+    entries.sort()
+    for _, old in entries[: max(0, len(entries) - self._max_entries)]:
+      try:
+        old.unlink()
+      except OSError:
+        pass
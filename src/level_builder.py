@@ -0,0 +1,306 @@
+"""Builds ``map.txt``, the skip-segment CSVs and a start position from a level's background.
+
+The background is split into one block of pixels per grid cell; a cell is
+playable when enough of its pixels are land. The walls are traced around the
+playable region, and diagonal wall segments that would double up an outline
+corner are written to the CSVs so the renderer skips them::
+
+    python -m src.level_builder atlantis
+    python -m src.level_builder --all --mask mask.png --force
+
+The grid size defaults to what the game draws: the window size from
+``config.yaml`` divided by its cell size (36x32). Other sizes only fit on
+screen once the config is changed to match.
+
+Land is anything that differs from the water colour by more than
+``--tolerance``. Backgrounds that show neighbouring countries need a mask
+image in the level folder (``--mask mask.png``), where the playable area is
+white or opaque. The shipped backgrounds all do, so an existing ``map.txt``
+is only overwritten (with ``--force``) from a mask, never from the
+background alone. Requires NumPy (``pip install snake[tools]``).
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pygame
+
+from src.map import Map
+from src.utils import load_config, load_levels
+
+__all__ = ["build_level", "main", "rasterize"]
+
+DEFAULT_WATER = "#5879BD"
+
+
+def _shift(mask: np.ndarray, dx: int, dy: int) -> np.ndarray:
+  """Returns *mask* moved by (dx, dy) so ``out[y, x] == mask[y - dy, x - dx]``, filling with False."""
+  out = np.zeros_like(mask)
+  height, width = mask.shape
+  out[max(dy, 0) : height + min(dy, 0), max(dx, 0) : width + min(dx, 0)] = mask[
+    max(-dy, 0) : height + min(-dy, 0), max(-dx, 0) : width + min(-dx, 0)
+  ]
+  return out
+
+
+def _dilate(mask: np.ndarray) -> np.ndarray:
+  return mask | _shift(mask, 1, 0) | _shift(mask, -1, 0) | _shift(mask, 0, 1) | _shift(mask, 0, -1)
+
+
+def _erode(mask: np.ndarray) -> np.ndarray:
+  return mask & _shift(mask, 1, 0) & _shift(mask, -1, 0) & _shift(mask, 0, 1) & _shift(mask, 0, -1)
+
+
+def _flood(mask: np.ndarray, seed: tuple[int, int]) -> np.ndarray:
+  """Returns the 4-connected region of *mask* containing the ``(x, y)`` *seed*."""
+  region = np.zeros_like(mask)
+  region[seed[1], seed[0]] = True
+  while True:
+    grown = _dilate(region) & mask
+    if np.array_equal(grown, region):
+      return region
+    region = grown
+
+
+def _largest_region(mask: np.ndarray) -> np.ndarray:
+  remaining = mask.copy()
+  best = np.zeros_like(mask)
+  while remaining.any():
+    y, x = np.argwhere(remaining)[0]
+    region = _flood(remaining, (x, y))
+    remaining &= ~region
+    if region.sum() > best.sum():
+      best = region
+  return best
+
+
+def land_mask(pixels: np.ndarray, water: tuple[int, int, int], tolerance: float) -> np.ndarray:
+  """Classifies an ``(h, w, 3)`` RGB array into land (True) and water."""
+  distance = np.linalg.norm(pixels.astype(np.float32) - np.asarray(water, np.float32), axis=-1)
+  return distance > tolerance
+
+
+def coverage(mask: np.ndarray, width: int, height: int) -> np.ndarray:
+  """Downsamples a pixel mask to a ``(height, width)`` grid of land fractions."""
+  pixel_height, pixel_width = mask.shape
+  cell_y = np.arange(pixel_height) * height // pixel_height
+  cell_x = np.arange(pixel_width) * width // pixel_width
+  index = (cell_y[:, None] * width + cell_x[None, :]).ravel()
+  totals = np.bincount(index, minlength=width * height)
+  hits = np.bincount(index, weights=mask.ravel(), minlength=width * height)
+  return (hits / np.maximum(totals, 1)).reshape(height, width)
+
+
+def rasterize(mask: np.ndarray, width: int, height: int, threshold: float = 0.5, start=None):
+  """Turns a pixel land mask into level data.
+
+  Returns ``(rows, start, skip_segments)``: the ``map.txt`` lines, the
+  ``(x, y)`` start cell, and for each CSV name the cells whose diagonal wall
+  segment should be skipped.
+  """
+  if start is not None and not (0 <= start[0] < width and 0 <= start[1] < height):
+    raise ValueError(f"Start cell {start} is outside the {width}x{height} grid.")
+
+  land = coverage(mask, width, height) >= threshold
+  # Keep the outermost ring free so the walls always fit on the grid.
+  land[0, :] = land[-1, :] = land[:, 0] = land[:, -1] = False
+
+  if start is not None and land[start[1], start[0]]:
+    land = _flood(land, start)
+  else:
+    land = _largest_region(land)
+  if not land.any():
+    raise ValueError("No playable cells; check the water colour, tolerance or mask.")
+
+  walls = _dilate(land) & ~land
+
+  if start is None or not land[start[1], start[0]]:
+    # Start on the most interior cell, nearest the middle of the region on ties.
+    depth = np.zeros(land.shape, np.int32)
+    current = land
+    while current.any():
+      depth += current
+      current = _erode(current)
+    candidates = np.argwhere(depth == depth.max())
+    centre = np.argwhere(land).mean(axis=0)
+    y, x = candidates[np.argmin(((candidates - centre) ** 2).sum(axis=1))]
+    start = (int(x), int(y))
+
+  # A diagonal segment is redundant where an orthogonal pair of segments
+  # already turns the same corner of the outline.
+  right = _shift(walls, -1, 0)
+  below = _shift(walls, 0, -1)
+  above = _shift(walls, 0, 1)
+  skip_down_right = walls & _shift(walls, -1, -1) & (right | below)
+  skip_up_right = walls & _shift(walls, -1, 1) & (right | above)
+
+  grid = np.full(land.shape, "x")
+  grid[land] = "."
+  grid[walls] = "#"
+  grid[start[1], start[0]] = "S"
+  rows = ["".join(row) for row in grid]
+
+  def _cells(skip):
+    return [(int(x), int(y)) for y, x in np.argwhere(skip)]
+
+  skip_segments = {
+    "right.csv": [],
+    "down.csv": [],
+    "down-right.csv": _cells(skip_down_right),
+    "up-right.csv": _cells(skip_up_right),
+  }
+  return rows, start, skip_segments
+
+
+def _read_pixels(path: str) -> np.ndarray:
+  # surfarray is indexed [x, y]; transpose to the usual [y, x].
+  return pygame.surfarray.array3d(pygame.image.load(path)).transpose(1, 0, 2)
+
+
+def _read_mask(path: str) -> np.ndarray:
+  surface = pygame.image.load(path)
+  if surface.get_flags() & pygame.SRCALPHA:
+    return pygame.surfarray.array_alpha(surface).T > 127
+  return _read_pixels(path).mean(axis=-1) > 127
+
+
+def build_level(
+  level_dir: str,
+  width: int,
+  height: int,
+  water: tuple[int, int, int],
+  tolerance: float = 40.0,
+  threshold: float = 0.5,
+  mask_name: str | None = None,
+  start=None,
+  force: bool = False,
+) -> dict:
+  """Writes ``map.txt`` and the four CSVs for the level in *level_dir* from its background."""
+  began = time.perf_counter()
+  map_path = os.path.join(level_dir, "map.txt")
+  mask_path = os.path.join(level_dir, mask_name) if mask_name else None
+  has_mask = mask_path is not None and os.path.exists(mask_path)
+  if os.path.exists(map_path):
+    if not force:
+      return {"level": level_dir, "skipped": "map.txt exists (use --force)"}
+    if not has_mask:
+      # Outlines traced from a background take in neighbouring countries,
+      # which would replace a hand-made map with a very different level.
+      return {"level": level_dir, "skipped": "map.txt exists and there is no mask to rebuild it from"}
+
+  if has_mask:
+    mask = _read_mask(mask_path)
+  else:
+    background = os.path.join(level_dir, "background.png")
+    if not os.path.exists(background):
+      return {"level": level_dir, "skipped": "no background.png"}
+    mask = land_mask(_read_pixels(background), water, tolerance)
+
+  rows, start, skip_segments = rasterize(mask, width, height, threshold, start)
+
+  with open(map_path, "w", encoding="utf-8") as file:
+    file.write("\n".join(rows))
+  for filename, cells in skip_segments.items():
+    with open(os.path.join(level_dir, filename), "w", encoding="utf-8", newline="") as file:
+      file.write("\n".join(f"{x},{y}" for x, y in cells))
+
+  # Validate the result the way the game will see it.
+  components = Map(level_dir).components
+  return {
+    "level": level_dir,
+    "start": start,
+    "cells": sum(row.count(".") + row.count("S") for row in rows),
+    "unreachable": sum(len(cells) for cells in components.cells[1:]),
+    "seconds": time.perf_counter() - began,
+  }
+
+
+def _parse_color(value: str) -> tuple[int, int, int]:
+  value = value.lstrip("#")
+  return tuple(int(value[i : i + 2], 16) for i in (0, 2, 4))
+
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(description="Generate level maps from their background images.")
+  parser.add_argument("levels", nargs="*", help="level names to build")
+  parser.add_argument("--all", action="store_true", help="build every level in levels.txt")
+  parser.add_argument("--directory", default="levels", help="levels directory")
+  parser.add_argument("--config", default="config.yaml", help="config file whose window and cell size set the grid")
+  parser.add_argument("--width", type=int, help="grid width in cells (default: what the config draws)")
+  parser.add_argument("--height", type=int, help="grid height in cells (default: what the config draws)")
+  parser.add_argument("--water", default=DEFAULT_WATER, help="water colour in the backgrounds")
+  parser.add_argument("--tolerance", type=float, default=40.0, help="colour distance still counted as water")
+  parser.add_argument("--threshold", type=float, default=0.5, help="land fraction that makes a cell playable")
+  parser.add_argument("--mask", help="mask image name inside each level folder, used instead of the background")
+  parser.add_argument("--start", help="x,y cell that selects the land region and start position")
+  parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+  parser.add_argument("--force", action="store_true", help="overwrite existing map.txt files that have a mask")
+  args = parser.parse_args(argv)
+
+  levels = load_levels(args.directory) if args.all else args.levels
+  if not levels:
+    parser.error("name at least one level or pass --all")
+
+  config = load_config(args.config)
+  screen = (36, 32)
+  if config:
+    screen = (config.window.width // config.grid.width, config.window.height // config.grid.height)
+  width = args.width or screen[0]
+  height = args.height or screen[1]
+  if (width, height) != screen:
+    print(
+      f"Warning: the game draws {screen[0]}x{screen[1]} cells with {args.config}; "
+      f"a {width}x{height} map will not fit until window.* or grid.* are changed to match."
+    )
+
+  start = None
+  if args.start:
+    try:
+      start = tuple(int(v) for v in args.start.split(","))
+    except ValueError:
+      start = ()
+    if len(start) != 2 or not (0 <= start[0] < width and 0 <= start[1] < height):
+      parser.error(f"--start must be x,y inside the {width}x{height} grid")
+
+  began = time.perf_counter()
+  with ProcessPoolExecutor(max_workers=args.workers) as pool:
+    futures = [
+      pool.submit(
+        build_level,
+        os.path.join(args.directory, level),
+        width,
+        height,
+        _parse_color(args.water),
+        args.tolerance,
+        args.threshold,
+        args.mask,
+        start,
+        args.force,
+      )
+      for level in levels
+    ]
+    for level, future in zip(levels, futures):
+      try:
+        result = future.result()
+      except Exception as e:  # noqa: BLE001 - one broken level should not abort the batch
+        print(f"{level}: failed, {e}")
+        continue
+      if "skipped" in result:
+        print(f"{result['level']}: skipped, {result['skipped']}")
+      else:
+        print(f"{result['level']}: start {result['start']}, {result['cells']} cells, {result['seconds']:.2f}s")
+        if result["unreachable"]:
+          print(f"  warning: {result['unreachable']} cells cannot be reached from the main region")
+
+  print(f"Built {len(levels)} levels in {time.perf_counter() - began:.2f}s.")
+  return 0
+
+
+if __name__ == "__main__":
+  sys.exit(main())
@@ -1,9 +1,13 @@
 import csv
 import os
+import time
+
+from src import metrics
+from src.reachability import ComponentIndex
 
 
 class Map:
-  def __init__(self, filepath):
+  def __init__(self, filepath, previous=None):
     self.walls = set()
     self.no_spawn = set()
     self.start_pos = (0, 0)
@@ -20,7 +24,18 @@ class Map:
       (1, -1): set(),  # up-right
     }
 
+    start = time.perf_counter()
     self.load_map(filepath)
+    # Walls and out of bounds cells behave the same for movement, so keep a
+    # single set for the hot path in ``next_cell``.
+    self.blocked = self.walls | self.no_spawn
+    metrics.MAP_LOAD_SECONDS.observe(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    # Which cells can reach each other. On a hot reload pass the *previous*
+    # map so the index is updated instead of rebuilt where possible.
+    self.components = ComponentIndex(self, previous.components if previous else None)
+    metrics.COMPONENT_INDEX_SECONDS.observe(time.perf_counter() - start)
 
   def _load_exceptions(self, map_dir):
     """Loads wall segment exceptions from CSVs in the map directory."""
@@ -80,6 +95,30 @@ class Map:
   def is_no_spawn(self, x, y):
     return (x, y) in self.no_spawn
 
+  def is_blocked(self, x, y):
+    return (x, y) in self.blocked
+
+  def next_cell(self, pos, direction):
+    """Returns the cell reached by moving one step from *pos* in *direction*.
+
+    Movement wraps around the map edges and skips over any run of wall or out
+    of bounds cells. The second value is the number of cells skipped; if the
+    scan is exhausted the returned cell is still blocked.
+    """
+    dx, dy = direction
+    new_x = (pos[0] + dx) % self.width
+    new_y = (pos[1] + dy) % self.height
+
+    scan_count = 0
+    max_scan = max(self.width, self.height)
+
+    while (new_x, new_y) in self.blocked and scan_count < max_scan:
+      new_x = (new_x + dx) % self.width
+      new_y = (new_y + dy) % self.height
+      scan_count += 1
+
+    return (new_x, new_y), scan_count
+
   def get_skip_segments(self):
     """Returns the dictionary of wall segments to skip."""
     return self.skip_segments
@@ -0,0 +1,191 @@
+"""Engine counters and histograms, exposed in the Prometheus text format.
+
+Recording a value is a couple of attribute updates, cheap enough for the
+tick loop. Metrics are only updated from the game thread, while the optional
+:class:`MetricsServer` reads them from its own thread; a scrape may see a
+histogram mid-update, which Prometheus tolerates.
+"""
+
+from __future__ import annotations
+
+import os
+import socketserver
+import stat
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+__all__ = [
+  "COMPONENT_INDEX_SECONDS",
+  "DRAW_SECONDS",
+  "FOOD_SPAWN_RETRIES",
+  "FRAME_OVERRUNS",
+  "FRAME_SECONDS",
+  "MAP_LOAD_SECONDS",
+  "MAP_RELOAD_SECONDS",
+  "REGISTRY",
+  "TICKS",
+  "WALL_SKIP_SCANS",
+  "Counter",
+  "Histogram",
+  "MetricsServer",
+  "Registry",
+]
+
+# Latency buckets in seconds, from sub-millisecond work up to a slow frame.
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+class Counter:
+  def __init__(self, name: str, help_text: str):
+    self.name = name
+    self.help = help_text
+    self.value = 0
+
+  def inc(self, amount: int = 1):
+    self.value += amount
+
+  def render(self) -> list[str]:
+    return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter", f"{self.name} {self.value}"]
+
+
+class Histogram:
+  def __init__(self, name: str, help_text: str, buckets=DEFAULT_BUCKETS):
+    self.name = name
+    self.help = help_text
+    self.buckets = tuple(buckets)
+    # One slot per bucket plus the +Inf overflow; made cumulative when rendered.
+    self.counts = [0] * (len(self.buckets) + 1)
+    self.sum = 0.0
+    self.count = 0
+
+  def observe(self, value: float):
+    self.counts[bisect_left(self.buckets, value)] += 1
+    self.sum += value
+    self.count += 1
+
+  def render(self) -> list[str]:
+    lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+    cumulative = 0
+    for bound, count in zip(self.buckets, self.counts):
+      cumulative += count
+      lines.append(f'{self.name}_bucket{{le="{bound}"}} {cumulative}')
+    lines.append(f'{self.name}_bucket{{le="+Inf"}} {cumulative + self.counts[-1]}')
+    lines.append(f"{self.name}_sum {self.sum}")
+    lines.append(f"{self.name}_count {self.count}")
+    return lines
+
+
+class Registry:
+  def __init__(self):
+    self._metrics: dict[str, Counter | Histogram] = {}
+
+  def counter(self, name: str, help_text: str) -> Counter:
+    return self._register(Counter(name, help_text))
+
+  def histogram(self, name: str, help_text: str, buckets=DEFAULT_BUCKETS) -> Histogram:
+    return self._register(Histogram(name, help_text, buckets))
+
+  def _register(self, metric):
+    if metric.name in self._metrics:
+      raise ValueError(f"Metric '{metric.name}' is already registered.")
+    self._metrics[metric.name] = metric
+    return metric
+
+  def render(self) -> str:
+    lines = []
+    for metric in list(self._metrics.values()):
+      lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+TICKS = REGISTRY.counter("snake_ticks_total", "World steps simulated.")
+WALL_SKIP_SCANS = REGISTRY.counter("snake_wall_skip_scans_total", "Cells scanned while skipping over walls.")
+FOOD_SPAWN_RETRIES = REGISTRY.counter("snake_food_spawn_retries_total", "Random cells rejected while placing food.")
+MAP_LOAD_SECONDS = REGISTRY.histogram("snake_map_load_seconds", "Time to parse a level's map and CSVs.")
+MAP_RELOAD_SECONDS = REGISTRY.histogram("snake_map_reload_seconds", "Time to apply a hot reload of the level.")
+COMPONENT_INDEX_SECONDS = REGISTRY.histogram(
+  "snake_component_index_seconds", "Time to build or update a level's reachable-region index."
+)
+DRAW_SECONDS = REGISTRY.histogram("snake_draw_seconds", "Time to draw one frame.")
+FRAME_SECONDS = REGISTRY.histogram("snake_frame_seconds", "Time spent on a frame before waiting for the next tick.")
+FRAME_OVERRUNS = REGISTRY.counter("snake_frame_overruns_total", "Frames that took longer than the tick budget.")
+
+
+class _Handler(BaseHTTPRequestHandler):
+  def do_GET(self):
+    if self.path.split("?")[0] not in ("/", "/metrics"):
+      self.send_error(404)
+      return
+    body = self.server.registry.render().encode("utf-8")
+    self.send_response(200)
+    self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+    self.send_header("Content-Length", str(len(body)))
+    self.end_headers()
+    self.wfile.write(body)
+
+  def log_message(self, format, *args):
+    # Scrapes every few seconds would otherwise flood stderr.
+    pass
+
+
+# Unix sockets are not available everywhere (e.g. on Windows).
+if hasattr(socketserver, "UnixStreamServer"):
+
+  class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class MetricsServer:
+  """Serves ``/metrics`` over local HTTP, or over a Unix socket if *unix_socket* is given."""
+
+  def __init__(
+    self,
+    host: str = "127.0.0.1",
+    port: int = 9464,
+    unix_socket: str | None = None,
+    registry: Registry = REGISTRY,
+  ):
+    if unix_socket:
+      if not hasattr(socketserver, "UnixStreamServer"):
+        raise OSError("Unix sockets are not supported on this platform; use metrics.host and metrics.port instead.")
+      _remove_stale_socket(unix_socket)
+      self._server = _UnixHTTPServer(unix_socket, _Handler)
+    else:
+      self._server = ThreadingHTTPServer((host, port), _Handler)
+      self._server.daemon_threads = True
+    self._server.registry = registry
+    self._unix_socket = unix_socket
+
+    self._thread = threading.Thread(target=self._server.serve_forever, name="MetricsServer", daemon=True)
+    self._thread.start()
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, exc_type, exc, tb):
+    self.stop()
+
+  def stop(self):
+    """Stops serving and waits for the background thread to exit."""
+    self._server.shutdown()
+    self._server.server_close()
+    self._thread.join(timeout=0.5)
+    if self._unix_socket:
+      try:
+        _remove_stale_socket(self._unix_socket)
+      except OSError:
+        pass
+
+
+def _remove_stale_socket(path: str):
+  """Removes a socket left at *path*, but refuses to delete anything else."""
+  try:
+    mode = os.stat(path).st_mode
+  except FileNotFoundError:
+    return
+  if not stat.S_ISSOCK(mode):
+    raise FileExistsError(f"'{path}' exists and is not a socket; refusing to replace it.")
+  os.unlink(path)
@@ -0,0 +1,44 @@
+from array import array
+
+__all__ = ["OccupancyGrid"]
+
+EMPTY = -1
+
+
+class OccupancyGrid:
+  """Flat grid recording which snake (by id) occupies each cell.
+
+  Every snake on the map shares one grid, so a collision test is a single
+  index lookup no matter how many snakes there are or how long they grow.
+  """
+
+  def __init__(self, width, height):
+    self.width = width
+    self.height = height
+    self.cells = array("i", [EMPTY]) * (width * height)
+
+  def _index(self, pos):
+    return pos[1] * self.width + pos[0]
+
+  def owner(self, pos):
+    """Returns the id of the snake on *pos*, or ``EMPTY``."""
+    return self.cells[self._index(pos)]
+
+  def is_free(self, pos):
+    return self.cells[self._index(pos)] == EMPTY
+
+  def occupy(self, pos, snake_id):
+    self.cells[self._index(pos)] = snake_id
+
+  def release(self, pos, snake_id):
+    """Frees *pos*, but only if it is still held by *snake_id*."""
+    index = self._index(pos)
+    if self.cells[index] == snake_id:
+      self.cells[index] = EMPTY
+
+  def copy(self):
+    clone = OccupancyGrid.__new__(OccupancyGrid)
+    clone.width = self.width
+    clone.height = self.height
+    clone.cells = array("i", self.cells)
+    return clone
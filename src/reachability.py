@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from array import array
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+  from src.map import Map
+
+__all__ = ["NO_COMPONENT", "ComponentIndex"]
+
+NO_COMPONENT = -1
+
+
+class ComponentIndex:
+  """Connected components of a map's movement graph.
+
+  Two free cells are connected when one step (wrapping around the edges and
+  skipping over wall and out of bounds cells) leads from one to the other.
+  Moving right from *a* lands on *b* exactly when moving left from *b* lands
+  on *a*, so the graph is undirected and only right/down steps are needed.
+
+  ``ids`` holds the component id of every cell (``NO_COMPONENT`` for blocked
+  ones) and ``cells[id]`` lists the free cells of each component, largest
+  component first.
+  """
+
+  def __init__(self, map_obj: Map, previous: ComponentIndex | None = None):
+    self.width = map_obj.width
+    self.height = map_obj.height
+    self._blocked = frozenset(map_obj.blocked)
+
+    freed = None
+    same_size = previous is not None and (previous.width, previous.height) == (self.width, self.height)
+    if same_size and self._blocked <= previous._blocked:
+      freed = previous._blocked - self._blocked
+
+    if freed is not None:
+      # Freeing cells only ever adds connections: an old step that skipped a
+      # freed cell is now two steps through it. Keep the old union-find and
+      # only re-link the rows and columns that contain a freed cell.
+      self._parent = array("i", previous._parent)
+      rows = {y for _, y in freed}
+      columns = {x for x, _ in freed}
+      self._link(map_obj, [(x, y) for y in rows for x in range(self.width)], (1, 0))
+      self._link(map_obj, [(x, y) for x in columns for y in range(self.height)], (0, 1))
+    else:
+      self._parent = array("i", range(self.width * self.height))
+      every_cell = [(x, y) for y in range(self.height) for x in range(self.width)]
+      self._link(map_obj, every_cell, (1, 0))
+      self._link(map_obj, every_cell, (0, 1))
+
+    self._number()
+
+  def _find(self, index: int) -> int:
+    parent = self._parent
+    while parent[index] != index:
+      parent[index] = parent[parent[index]]
+      index = parent[index]
+    return index
+
+  def _link(self, map_obj: Map, cells, direction):
+    width = self.width
+    for cell in cells:
+      if cell in self._blocked:
+        continue
+      target, _ = map_obj.next_cell(cell, direction)
+      if target in self._blocked:
+        continue
+      a = self._find(cell[1] * width + cell[0])
+      b = self._find(target[1] * width + target[0])
+      if a != b:
+        self._parent[max(a, b)] = min(a, b)
+
+  def _number(self):
+    groups: dict[int, list[tuple[int, int]]] = {}
+    for y in range(self.height):
+      for x in range(self.width):
+        if (x, y) not in self._blocked:
+          groups.setdefault(self._find(y * self.width + x), []).append((x, y))
+
+    self.cells: list[list[tuple[int, int]]] = sorted(groups.values(), key=len, reverse=True)
+    self.ids = array("i", [NO_COMPONENT]) * (self.width * self.height)
+    for component, cells in enumerate(self.cells):
+      for x, y in cells:
+        self.ids[y * self.width + x] = component
+
+  def component_at(self, x, y) -> int:
+    """Returns the component id of a cell, or ``NO_COMPONENT`` if it is blocked."""
+    return self.ids[y * self.width + x]
+
+  def connected(self, a, b) -> bool:
+    component = self.component_at(*a)
+    return component != NO_COMPONENT and component == self.component_at(*b)
+
+  def __len__(self):
+    return len(self.cells)
@@ -2,13 +2,24 @@ import math
 
 import pygame
 
+from src.image_cache import ImageCache
 from src.utils import Config
 
 
 class Renderer:
   """Modern renderer with visual enhancements."""
 
-  def __init__(self, screen, config: Config, cell_width, cell_height, map_width, map_height, skip_segments):
+  def __init__(
+    self,
+    screen,
+    config: Config,
+    cell_width,
+    cell_height,
+    map_width,
+    map_height,
+    skip_segments,
+    image_cache: ImageCache | None = None,
+  ):
     self.screen = screen
     self.config = config
     self.cell_width = cell_width
@@ -16,106 +27,162 @@ class Renderer:
     self.map_width = map_width
     self.map_height = map_height
     self.skip_segments = skip_segments  # Store the skip segments
-
-    # Helper to load and scale an asset
-    def _load_asset(filename, scale_factor=1.0, is_apple=False):
-      if is_apple:
-        original_image = pygame.image.load(f"assets/{filename}").convert_alpha()
-      else:
-        original_image = pygame.image.load(f"assets/{config.colors.snake}/{filename}").convert_alpha()
-      scale = min(self.cell_width, self.cell_height) / original_image.get_width()
-      return pygame.transform.rotozoom(original_image, 0, scale * scale_factor)
+    self.image_cache = image_cache or ImageCache(None)
 
     # Small font for coordinate labels
     font_size = max(10, int(min(cell_width, cell_height) / 2.5))
     self.grid_font = pygame.font.SysFont("Arial", font_size)
 
     # Load Food Image
-    self.apple_image = _load_asset("apple.png", 0.9, True)
-
-    # Load Snake Head
-    self.head_assets = {
-      (-1, 0): _load_asset("head_left.png"),  # Left
-      (1, 0): _load_asset("head_right.png"),  # Right
-      (0, -1): _load_asset("head_up.png"),  # Up
-      (0, 1): _load_asset("head_down.png"),  # Down
-    }
+    self.apple_image = self._load_asset("apple.png", 0.9)
+
+    # Player snakes and bots use separate skins; the bot skin is only loaded
+    # once a bot is drawn.
+    self.player_skin = self._load_skin(config.colors.snake)
+    self._bot_skin = None
+
+  @property
+  def bot_skin(self):
+    if self._bot_skin is None:
+      if self.config.colors.bot == self.config.colors.snake:
+        self._bot_skin = self.player_skin
+      else:
+        self._bot_skin = self._load_skin(self.config.colors.bot)
+    return self._bot_skin
 
-    # Load Snake Tail
-    self.tail_assets = {
-      (1, 0): _load_asset("tail_left.png"),  # Tail goes left (snake body is to the right)
-      (-1, 0): _load_asset("tail_right.png"),  # Tail goes right (snake body is to the left)
-      (0, 1): _load_asset("tail_up.png"),  # Tail goes up (snake body is down)
-      (0, -1): _load_asset("tail_down.png"),  # Tail goes down (snake body is up)
-    }
+  def _load_asset(self, filename, scale_factor=1.0):
+    """Load an asset and scale it to the cell size."""
 
-    # Load Straight Body Parts
-    self.body_straights = {
-      (-1, 0): _load_asset("body_horizontal.png"),
-      (1, 0): _load_asset("body_horizontal.png"),
-      (0, -1): _load_asset("body_vertical.png"),
-      (0, 1): _load_asset("body_vertical.png"),
-    }
+    def _scale(original_image):
+      scale = min(self.cell_width, self.cell_height) / original_image.get_width()
+      return pygame.transform.rotozoom(original_image, 0, scale * scale_factor)
 
-    # Load Turning Body Parts (Key is (v_in, v_out) where v_in is vector into cell, v_out is vector out of cell)
-    self.body_turns = {
-      # body_topleft.png (L-shape from top-left)
-      ((0, 1), (-1, 0)): _load_asset("body_topleft.png"),  # In from Down, Out to Left
-      ((1, 0), (0, -1)): _load_asset("body_topleft.png"),  # In from Right, Out to Up
-      # body_topright.png (L-shape from top-right)
-      ((0, 1), (1, 0)): _load_asset("body_topright.png"),  # In from Down, Out to Right
-      ((-1, 0), (0, -1)): _load_asset("body_topright.png"),  # In from Left, Out to Up
-      # body_bottomleft.png (L-shape from bottom-left)
-      ((0, -1), (-1, 0)): _load_asset("body_bottomleft.png"),  # In from Up, Out to Left
-      ((1, 0), (0, 1)): _load_asset("body_bottomleft.png"),  # In from Right, Out to Down
-      # body_bottomright.png (L-shape from bottom-right)
-      ((0, -1), (1, 0)): _load_asset("body_bottomright.png"),  # In from Up, Out to Right
-      ((-1, 0), (0, 1)): _load_asset("body_bottomright.png"),  # In from Left, Out to Down
+    key = f"rotozoom:{self.cell_width}x{self.cell_height}:{scale_factor}"
+    return self.image_cache.load(f"assets/{filename}", key, _scale, alpha=True)
+
+  def _load_skin(self, skin):
+    """Loads every snake sprite from ``assets/<skin>``."""
+
+    def _load(filename):
+      return self._load_asset(f"{skin}/{filename}")
+
+    return {
+      # Load Snake Head
+      "head": {
+        (-1, 0): _load("head_left.png"),  # Left
+        (1, 0): _load("head_right.png"),  # Right
+        (0, -1): _load("head_up.png"),  # Up
+        (0, 1): _load("head_down.png"),  # Down
+      },
+      # Load Snake Tail
+      "tail": {
+        (1, 0): _load("tail_left.png"),  # Tail goes left (snake body is to the right)
+        (-1, 0): _load("tail_right.png"),  # Tail goes right (snake body is to the left)
+        (0, 1): _load("tail_up.png"),  # Tail goes up (snake body is down)
+        (0, -1): _load("tail_down.png"),  # Tail goes down (snake body is up)
+      },
+      # Load Straight Body Parts
+      "straight": {
+        (-1, 0): _load("body_horizontal.png"),
+        (1, 0): _load("body_horizontal.png"),
+        (0, -1): _load("body_vertical.png"),
+        (0, 1): _load("body_vertical.png"),
+      },
+      # Load Turning Body Parts (Key is (v_in, v_out) where v_in is vector into cell, v_out is vector out of cell)
+      "turn": {
+        # body_topleft.png (L-shape from top-left)
+        ((0, 1), (-1, 0)): _load("body_topleft.png"),  # In from Down, Out to Left
+        ((1, 0), (0, -1)): _load("body_topleft.png"),  # In from Right, Out to Up
+        # body_topright.png (L-shape from top-right)
+        ((0, 1), (1, 0)): _load("body_topright.png"),  # In from Down, Out to Right
+        ((-1, 0), (0, -1)): _load("body_topright.png"),  # In from Left, Out to Up
+        # body_bottomleft.png (L-shape from bottom-left)
+        ((0, -1), (-1, 0)): _load("body_bottomleft.png"),  # In from Up, Out to Left
+        ((1, 0), (0, 1)): _load("body_bottomleft.png"),  # In from Right, Out to Down
+        # body_bottomright.png (L-shape from bottom-right)
+        ((0, -1), (1, 0)): _load("body_bottomright.png"),  # In from Up, Out to Right
+        ((-1, 0), (0, 1)): _load("body_bottomright.png"),  # In from Left, Out to Down
+      },
     }
 
   def draw_snake(self, snake):
     """Draw snake using asset images."""
+    self.draw_snakes((snake,))
+
+  def draw_snakes(self, snakes):
+    """Draw all *snakes* with a single batched ``blits`` call."""
+    cell_width = self.cell_width
+    cell_height = self.cell_height
+    sequence = []
+
+    for snake in snakes:
+      # We need at least the head to draw anything
+      if not snake.body:
+        continue
+
+      skin = self.bot_skin if snake.bot else self.player_skin
+      straights = skin["straight"]
+      turns = skin["turn"]
+      directions = snake.directions
+      last = len(snake.body) - 1
+
+      for i, (x, y) in enumerate(snake.body):
+        if i == 0:
+          # Head
+          image = skin["head"].get(snake.direction)
+
+        elif i == last:
+          # Tail
+          # Re-compute the current tail orientation from the position of the
+          # segment immediately in front of it so that the sprite changes
+          # the very frame the tail goes around a corner.
+          image = skin["tail"].get(directions[i - 1])
 
-    # We need at least the head to draw anything
-    if not snake.body:
-      return
-
-    for i, (x, y) in enumerate(snake.body):
-      image = None
-
-      if i == 0:
-        # Head
-        image = self.head_assets.get(snake.direction)
-
-      elif i == len(snake.body) - 1:
-        # Tail
-        # Re-compute the current tail orientation from the position of the
-        # segment immediately in front of it so that the sprite changes
-        # the very frame the tail goes around a corner.
-        v_next = snake.directions[i - 1]
-        image = self.tail_assets.get(v_next)
-
-      else:
-        # Body segment
-        # Retrieve the entry & exit vectors that were stored while the
-        # snake was moving. Because ``directions`` mirrors ``body`` we
-        # have:
-        #   directions[i]   – vector that this segment followed when it moved
-        #   directions[i-1] – vector that the next segment (towards the head)
-        #                      followed – i.e. the *out* vector.
-        v_prev = snake.directions[i]  # vector into this segment
-        v_next = snake.directions[i - 1]  # vector out of this segment
-
-        if v_prev == v_next:
-          # Straight segment
-          image = self.body_straights.get(v_prev)
         else:
-          # Corner segment (v_prev is the 'in' direction, v_next is the 'out' direction)
-          image = self.body_turns.get((v_prev, v_next))
-
-      if image:
-        rect = image.get_rect(topleft=(x * self.cell_width, y * self.cell_height))
-        self.screen.blit(image, rect)
+          # Body segment
+          # Retrieve the entry & exit vectors that were stored while the
+          # snake was moving. Because ``directions`` mirrors ``body`` we
+          # have:
+          #   directions[i]   – vector that this segment followed when it moved
+          #   directions[i-1] – vector that the next segment (towards the head)
+          #                      followed – i.e. the *out* vector.
+          v_prev = directions[i]  # vector into this segment
+          v_next = directions[i - 1]  # vector out of this segment
+
+          if v_prev == v_next:
+            # Straight segment
+            image = straights.get(v_prev)
+          else:
+            # Corner segment (v_prev is the 'in' direction, v_next is the 'out' direction)
+            image = turns.get((v_prev, v_next))
+
+        if image:
+          sequence.append((image, (x * cell_width, y * cell_height)))
+
+    self.screen.blits(sequence, doreturn=False)
+
+  def draw_world(self, world, time_ms, background_image=None):
+    """Draw a complete frame of *world*: background, walls, food and live snakes."""
+    # Draw background
+    if background_image:
+      self.screen.blit(background_image, (0, 0))
+    else:
+      # Fallback to single color if image is not found or failed to load
+      self.screen.fill(self.config.colors.background)
+
+    # Draw grid
+    if self.config.grid.draw:
+      self.draw_grid(world.map.width, world.map.height)
+
+    # Draw walls
+    self.draw_walls(world.map.walls)
+
+    # Draw food
+    for food in world.foods:
+      self.draw_food(food, time_ms)
+
+    # Draw snakes
+    self.draw_snakes(world.alive_snakes())
 
   def draw_food(self, food_pos, time_ms):
     """Draw food as an image with a bobbing animation."""
@@ -0,0 +1,102 @@
+"""Recorded games that can be played back tick by tick.
+
+A replay is a snapshot of the world when the game started plus every turn
+the players made. Bots and food placement are driven by the world's seeded
+RNG, so stepping the snapshot while re-applying the turns reproduces the
+game exactly, as long as the map did not change during it.
+"""
+
+import struct
+from collections.abc import Iterator
+
+from src import snapshot
+from src.map import Map
+from src.world import World
+
+__all__ = ["Replay", "ReplayError"]
+
+_MAGIC = b"SNKR"
+_VERSION = 1
+_HEADER = struct.Struct("<4sBI")  # magic, version, snapshot length
+_TURN = struct.Struct("<IHB")  # tick, snake id, direction code
+
+_DIRECTIONS = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+_DIRECTION_CODES = {direction: code for code, direction in enumerate(_DIRECTIONS)}
+
+
+class ReplayError(ValueError):
+  """Raised when a replay file is malformed."""
+
+
+class Replay:
+  def __init__(self, start: bytes):
+    self.start = start  # snapshot of the world before the first tick
+    self.turns: list[tuple[int, int, tuple[int, int]]] = []
+    self._directions: dict[int, tuple[int, int]] = {}
+
+  @classmethod
+  def record(cls, world: World, level: str) -> "Replay":
+    return cls(snapshot.dumps(world, level))
+
+  @property
+  def level(self) -> str:
+    return snapshot.snapshot_level(self.start)
+
+  def capture(self, world: World):
+    """Records the players' turns; call right before ``world.step()``."""
+    for snake in world.snakes:
+      if snake.bot or not snake.alive:
+        continue
+      direction = snake.direction_queue[0] if snake.direction_queue else snake.direction
+      if self._directions.get(snake.id) != direction:
+        self._directions[snake.id] = direction
+        self.turns.append((world.ticks, snake.id, direction))
+
+  def play(self, map_obj: Map, max_ticks: int | None = None) -> Iterator[World]:
+    """Yields the world before the first tick and after every tick until the game ends."""
+    world = snapshot.loads(self.start, map_obj)
+    players = [snake for snake in world.snakes if not snake.bot]
+    contenders = players or world.snakes
+    turns = iter(self.turns)
+    turn = next(turns, None)
+
+    yield world
+    while any(snake.alive for snake in contenders) and (max_ticks is None or world.ticks < max_ticks):
+      while turn is not None and turn[0] == world.ticks:
+        world.snakes[turn[1]].direction_queue = [turn[2]]
+        turn = next(turns, None)
+      world.step()
+      yield world
+
+  def dumps(self) -> bytes:
+    data = [_HEADER.pack(_MAGIC, _VERSION, len(self.start)), self.start, struct.pack("<I", len(self.turns))]
+    data.extend(_TURN.pack(tick, snake_id, _DIRECTION_CODES[direction]) for tick, snake_id, direction in self.turns)
+    return b"".join(data)
+
+  @classmethod
+  def loads(cls, data: bytes) -> "Replay":
+    try:
+      magic, version, length = _HEADER.unpack_from(data)
+      if magic != _MAGIC:
+        raise ReplayError("Not a snake replay.")
+      if version != _VERSION:
+        raise ReplayError(f"Unsupported replay version {version}.")
+      offset = _HEADER.size
+      replay = cls(data[offset : offset + length])
+      offset += length
+      (count,) = struct.unpack_from("<I", data, offset)
+      offset += 4
+      for tick, snake_id, code in _TURN.iter_unpack(data[offset : offset + count * _TURN.size]):
+        replay.turns.append((tick, snake_id, _DIRECTIONS[code]))
+    except (struct.error, IndexError) as e:
+      raise ReplayError(f"Replay is corrupt: {e}") from e
+    return replay
+
+  def save(self, path: str):
+    with open(path, "wb") as file:
+      file.write(self.dumps())
+
+  @classmethod
+  def load(cls, path: str) -> "Replay":
+    with open(path, "rb") as file:
+      return cls.loads(file.read())
@@ -1,5 +1,10 @@
 class Snake:
-  def __init__(self, start_pos, start_width):
+  def __init__(self, start_pos, start_width, snake_id=0, bot=False):
+    self.id = snake_id
+    self.bot = bot
+    self.alive = True
+    self.death_cause = None
+    self.score = 0
     self.body = [start_pos]
     self.direction = (1, 0)  # Default moving right
     # Maintain a parallel list of movement directions for each body segment.
@@ -7,10 +12,31 @@ class Snake:
     # moved into its current position.
     self.directions = [self.direction]
     self.grow_pending = start_width
+    # Directions requested by the player but not yet applied, at most two.
+    self.direction_queue = []
+
+  def copy(self):
+    """Returns a copy whose body and queues can change independently of this snake."""
+    clone = Snake.__new__(Snake)
+    clone.__dict__.update(self.__dict__)
+    clone.body = self.body.copy()
+    clone.directions = self.directions.copy()
+    clone.direction_queue = self.direction_queue.copy()
+    return clone
 
   def get_head(self):
     return self.body[0]
 
+  def queue_direction(self, new_direction):
+    """Queues a turn unless it would reverse the snake onto itself."""
+    check_direction = self.direction_queue[-1] if self.direction_queue else self.direction
+
+    is_horizontal_reverse = (new_direction[0] + check_direction[0] == 0) and (new_direction[0] != 0)
+    is_vertical_reverse = (new_direction[1] + check_direction[1] == 0) and (new_direction[1] != 0)
+
+    if not (is_horizontal_reverse or is_vertical_reverse) and len(self.direction_queue) < 2:
+      self.direction_queue.append(new_direction)
+
   def move(self, new_head):
     """Move snake by inserting a new head and optionally removing the tail.
 
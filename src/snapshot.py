@@ -0,0 +1,181 @@
+"""Compact binary snapshots of a :class:`World` for save and resume.
+
+A snapshot holds everything that changes during a game: every snake (body,
+directions, queued turns, growth and score), the food, the tick counter and
+the RNG state. The map itself is only referenced by level name, so loading
+needs the already parsed :class:`Map`. For in-memory branching use
+:meth:`World.fork` instead, which avoids serialisation entirely.
+"""
+
+import struct
+import zlib
+from array import array
+from io import BytesIO
+
+from src.bots import POLICIES, resolve_policy
+from src.map import Map
+from src.snake import Snake
+from src.world import World
+
+__all__ = ["SnapshotError", "dumps", "loads", "snapshot_level"]
+
+_MAGIC = b"SNKS"
+_VERSION = 1
+_HEADER = struct.Struct("<4sB")
+
+_WORLD = struct.Struct("<IIIIHH")  # seed, ticks, start width, food count, map width, map height
+_SNAKE = struct.Struct("<H??BBIIIB")  # id, bot, alive, cause, direction, score, grow, length, queue length
+_GAUSS = struct.Struct("<?d")
+
+_DIRECTIONS = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+_DIRECTION_CODES = {direction: code for code, direction in enumerate(_DIRECTIONS)}
+_CAUSES = [None, "wall", "self", "snake", "head", "reload"]
+_CAUSE_CODES = {cause: code for code, cause in enumerate(_CAUSES)}
+
+
+class SnapshotError(ValueError):
+  """Raised when a snapshot is malformed or does not fit the given map."""
+
+
+def _write_str(out: BytesIO, value: str):
+  data = value.encode("utf-8")
+  out.write(struct.pack("<H", len(data)))
+  out.write(data)
+
+
+def _read_str(data: BytesIO) -> str:
+  (length,) = struct.unpack("<H", data.read(2))
+  return data.read(length).decode("utf-8")
+
+
+def _read(data: BytesIO, fmt: struct.Struct):
+  return fmt.unpack(data.read(fmt.size))
+
+
+def _policy_name(policy) -> str:
+  for name, registered in POLICIES.items():
+    if registered is policy:
+      return name
+  name = f"{policy.__module__}:{policy.__qualname__}"
+  try:
+    resolved = resolve_policy(name)
+  except (AttributeError, ImportError, ValueError):
+    resolved = None
+  if resolved is not policy:
+    raise SnapshotError(f"Bot policy {policy!r} cannot be saved; use a registered policy or a module-level function.")
+  return name
+
+
+def dumps(world: World, level: str) -> bytes:
+  """Serialises *world*, which is playing *level*, to bytes."""
+  out = BytesIO()
+  _write_str(out, level)
+  out.write(
+    _WORLD.pack(world.seed, world.ticks, world.start_width, world.food_count, world.map.width, world.map.height)
+  )
+
+  version, state, gauss_next = world.rng.getstate()
+  out.write(struct.pack("<BH", version, len(state)))
+  out.write(array("I", state).tobytes())
+  out.write(_GAUSS.pack(gauss_next is not None, gauss_next or 0.0))
+
+  foods = array("H", [c for food in sorted(world.foods) for c in food])
+  out.write(struct.pack("<H", len(world.foods)))
+  out.write(foods.tobytes())
+
+  out.write(struct.pack("<H", len(world.snakes)))
+  for snake in world.snakes:
+    out.write(
+      _SNAKE.pack(
+        snake.id,
+        snake.bot,
+        snake.alive,
+        _CAUSE_CODES[snake.death_cause],
+        _DIRECTION_CODES[snake.direction],
+        snake.score,
+        snake.grow_pending,
+        len(snake.body),
+        len(snake.direction_queue),
+      )
+    )
+    policy = world.policies.get(snake.id)
+    _write_str(out, _policy_name(policy) if policy is not None else "")
+    out.write(array("H", [c for pos in snake.body for c in pos]).tobytes())
+    out.write(bytes(_DIRECTION_CODES[d] for d in snake.directions))
+    out.write(bytes(_DIRECTION_CODES[d] for d in snake.direction_queue))
+
+  return _HEADER.pack(_MAGIC, _VERSION) + zlib.compress(out.getvalue())
+
+
+def _payload(data: bytes) -> BytesIO:
+  if len(data) < _HEADER.size:
+    raise SnapshotError("Snapshot is truncated.")
+  magic, version = _HEADER.unpack_from(data)
+  if magic != _MAGIC:
+    raise SnapshotError("Not a snake snapshot.")
+  if version != _VERSION:
+    raise SnapshotError(f"Unsupported snapshot version {version}.")
+  try:
+    return BytesIO(zlib.decompress(data[_HEADER.size :]))
+  except zlib.error as e:
+    raise SnapshotError(f"Snapshot is corrupt: {e}") from e
+
+
+def snapshot_level(data: bytes) -> str:
+  """Returns the level name a snapshot was taken on, so its map can be loaded."""
+  return _read_str(_payload(data))
+
+
+def loads(data: bytes, map_obj: Map) -> World:
+  """Rebuilds a :class:`World` from a snapshot, on the already loaded *map_obj*."""
+  payload = _payload(data)
+  try:
+    _read_str(payload)
+    seed, ticks, start_width, food_count, width, height = _read(payload, _WORLD)
+    if (width, height) != (map_obj.width, map_obj.height):
+      raise SnapshotError(f"Snapshot is for a {width}x{height} map, not {map_obj.width}x{map_obj.height}.")
+
+    world = World(map_obj, start_width, food_count, seed)
+    world.ticks = ticks
+
+    version, state_length = struct.unpack("<BH", payload.read(3))
+    state = array("I")
+    state.frombytes(payload.read(state_length * state.itemsize))
+    has_gauss, gauss_next = _read(payload, _GAUSS)
+    world.rng.setstate((version, tuple(state), gauss_next if has_gauss else None))
+
+    (food_total,) = struct.unpack("<H", payload.read(2))
+    foods = array("H")
+    foods.frombytes(payload.read(food_total * 2 * foods.itemsize))
+    world.foods = set(zip(foods[::2], foods[1::2]))
+
+    (snake_total,) = struct.unpack("<H", payload.read(2))
+    for _ in range(snake_total):
+      snake_id, bot, alive, cause, direction, score, grow, length, queue_length = _read(payload, _SNAKE)
+      policy = _read_str(payload)
+      body = array("H")
+      body.frombytes(payload.read(length * 2 * body.itemsize))
+
+      snake = Snake((body[0], body[1]), start_width, snake_id, bot)
+      snake.alive = alive
+      snake.death_cause = _CAUSES[cause]
+      snake.direction = _DIRECTIONS[direction]
+      snake.score = score
+      snake.grow_pending = grow
+      snake.body = list(zip(body[::2], body[1::2]))
+      snake.directions = [_DIRECTIONS[code] for code in payload.read(length)]
+      snake.direction_queue = [_DIRECTIONS[code] for code in payload.read(queue_length)]
+      world.snakes.append(snake)
+      if policy:
+        world.policies[snake_id] = resolve_policy(policy)
+  except SnapshotError:
+    raise
+  except (AttributeError, ImportError) as e:
+    raise SnapshotError(f"Snapshot uses a bot policy that cannot be loaded: {e}") from e
+  except (struct.error, IndexError, ValueError) as e:
+    raise SnapshotError(f"Snapshot is corrupt: {e}") from e
+
+  for snake in world.alive_snakes():
+    for pos in snake.body:
+      world.grid.occupy(pos, snake.id)
+  return world
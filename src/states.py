@@ -1,12 +1,18 @@
 import os
+import time
+import uuid
 
 import pygame
 
+from src import metrics, snapshot
+from src.bots import greedy_policy
 from src.map import Map
 from src.map_watcher import MapWatcher
 from src.renderer import Renderer
-from src.snake import Snake
-from src.utils import Config
+from src.replay import Replay
+from src.utils import Config, load_levels
+from src.video import VideoExporter
+from src.world import World
 
 
 class GameState:
@@ -36,12 +42,8 @@ class MenuState(GameState):
     self.config = config
 
     # --- Level selection setup ---------------------------------------------
-    levels_file = os.path.join(self.config.path.directory, "levels.txt")
-    self.levels: list[str] = []
-    try:
-      with open(levels_file, "r", encoding="utf-8") as file:
-        self.levels = [line.strip() for line in file if line.strip()]
-    except FileNotFoundError:
+    self.levels = load_levels(self.config.path.directory)
+    if not self.levels:
       # Fallback to a single level defined in the YAML if *levels.txt* is missing
       self.levels = [self.config.path.level]
 
@@ -95,7 +97,23 @@ class MenuState(GameState):
 
 
 class PlayState(GameState):
-  def __init__(self, manager, config: Config):
+  # Key bindings per local player. A single player may use either set.
+  PLAYER_KEYS = (
+    {
+      pygame.K_w: (0, -1),
+      pygame.K_s: (0, 1),
+      pygame.K_a: (-1, 0),
+      pygame.K_d: (1, 0),
+    },
+    {
+      pygame.K_UP: (0, -1),
+      pygame.K_DOWN: (0, 1),
+      pygame.K_LEFT: (-1, 0),
+      pygame.K_RIGHT: (1, 0),
+    },
+  )
+
+  def __init__(self, manager, config: Config, snapshot_data: bytes | None = None):
     super().__init__(manager)
     self.config = config
     self.cell_width = self.config.grid.width
@@ -103,9 +121,28 @@ class PlayState(GameState):
     self.level_dir = os.path.join(self.config.path.directory, self.config.path.level)
 
     self.map = Map(self.level_dir)
-    self.snake = Snake(self.map.start_pos, self.config.game.width)
-    self.food = None
-    self.score = 0
+    if snapshot_data is not None:
+      # Resuming a saved game; the caller already switched to its level.
+      self.world = snapshot.loads(snapshot_data, self.map)
+      self.players = [snake for snake in self.world.snakes if not snake.bot]
+    else:
+      self.world = World(self.map, self.config.game.width, self.config.game.food)
+
+      # Local players first, so the first one gets the map's start position.
+      players = min(self.config.game.players, len(self.PLAYER_KEYS))
+      self.players = [self.world.add_snake(self.map.start_pos) for _ in range(players)]
+      self.players = [snake for snake in self.players if snake is not None]
+      for _ in range(self.config.game.bots):
+        self.world.add_snake(policy=greedy_policy)
+      self.world.spawn_food()
+
+    if len(self.players) == 1:
+      self.key_bindings = {key: (self.players[0], d) for keys in self.PLAYER_KEYS for key, d in keys.items()}
+    else:
+      self.key_bindings = {
+        key: (snake, d) for snake, keys in zip(self.players, self.PLAYER_KEYS) for key, d in keys.items()
+      }
+
     self.renderer = Renderer(
       self.screen,
       self.config,
@@ -114,75 +151,166 @@ class PlayState(GameState):
       self.map.width,
       self.map.height,
       self.map.get_skip_segments(),
+      self.manager.image_cache,
     )
-    self.spawn_food()
-    self.direction_queue = []
 
     self.background_image = None
     self._reload_needed = False
 
-    def _request_reload(_):
+    self.replay = Replay.record(self.world, self.config.path.level)
+    self.video = None
+
+    # --- Telemetry -----------------------------------------------------------
+    self.telemetry = manager.telemetry
+    self.run_id = uuid.uuid4().hex
+    self._start_time = time.monotonic()
+    self._last_food_tick = {snake.id: 0 for snake in self.world.snakes}
+    self._end_reason = "quit"
+    self._emit(
+      "game_start",
+      level=self.config.path.level,
+      seed=self.world.seed,
+      players=len(self.players),
+      bots=len(self.world.snakes) - len(self.players),
+    )
+
+    def _request_reload(path):
       """Callback from the background MapWatcher thread (any file changed)."""
       self._reload_needed = True
+      self._emit("reload_requested", path=path.name)
 
     self._watcher = MapWatcher(self.level_dir, _request_reload)
 
+    self._load_background()
+
+  def _load_background(self):
+    """Loads *background.png* scaled to the window, through the image cache."""
     background_path = os.path.join(self.level_dir, "background.png")
 
     if os.path.exists(background_path):
       try:
-        image = pygame.image.load(background_path).convert()
-        self.background_image = pygame.transform.scale(image, (self.manager.width, self.manager.height))
+        self.background_image = self.manager.image_cache.load_scaled(
+          background_path, (self.manager.width, self.manager.height)
+        )
       except pygame.error as e:
         print(f"Error loading background image: {e}")
 
+  @property
+  def snake(self):
+    """The first local player's snake, or *None* in a bots-only game."""
+    return self.players[0] if self.players else None
+
+  @property
+  def score(self):
+    return sum(snake.score for snake in self.players)
+
+  def _emit(self, event, **fields):
+    """Queues a telemetry event for this run, if telemetry is enabled."""
+    if self.telemetry:
+      self.telemetry.emit(event, run=self.run_id, tick=self.world.ticks, **fields)
+
   def on_exit(self):
     """Called by Game when this state is replaced. Stop background watcher."""
     if hasattr(self, "_watcher"):
       self._watcher.stop()
 
-  def spawn_food(self):
-    import random
+    if self.video:
+      self.toggle_video()
 
-    while True:
-      x = random.randint(0, self.map.width - 1)
-      y = random.randint(0, self.map.height - 1)
-      if not self.map.is_wall(x, y) and not self.map.is_no_spawn(x, y) and (x, y) not in self.snake.body:
-        self.food = (x, y)
-        break
+    try:
+      os.makedirs(self.config.path.replays, exist_ok=True)
+      self.replay.save(os.path.join(self.config.path.replays, "last.snkr"))
+    except OSError as e:
+      print(f"Error saving replay: {e}")
+
+    self._emit(
+      "game_end",
+      reason=self._end_reason,
+      score=self.score,
+      lengths={snake.id: len(snake.body) for snake in self.players},
+      seconds=round(time.monotonic() - self._start_time, 3),
+    )
+    if self.telemetry:
+      self.telemetry.flush()
 
   def handle_input(self, events):
     for event in events:
       if event.type == pygame.KEYDOWN:
-        new_direction = None
-
-        if event.key == pygame.K_UP or event.key == pygame.K_w:
-          new_direction = (0, -1)
-        elif event.key == pygame.K_DOWN or event.key == pygame.K_s:
-          new_direction = (0, 1)
-        elif event.key == pygame.K_LEFT or event.key == pygame.K_a:
-          new_direction = (-1, 0)
-        elif event.key == pygame.K_RIGHT or event.key == pygame.K_d:
-          new_direction = (1, 0)
-        elif event.key == pygame.K_ESCAPE:
+        if event.key == pygame.K_ESCAPE:
           self.manager.change_state(MenuState(self.manager, self.config))
           return
+        elif event.key == pygame.K_F5:
+          self.save_game()
+        elif event.key == pygame.K_F9:
+          self.load_game()
+          return
+        elif event.key == pygame.K_F12:
+          self.toggle_video()
+
+        binding = self.key_bindings.get(event.key)
+        if binding:
+          snake, new_direction = binding
+          snake.queue_direction(new_direction)
 
-        if new_direction:
-          check_direction = self.direction_queue[-1] if self.direction_queue else self.snake.direction
+  @property
+  def save_path(self):
+    return os.path.join(self.config.path.saves, "quicksave.snk")
 
-          is_horizontal_reverse = (new_direction[0] + check_direction[0] == 0) and (new_direction[0] != 0)
-          is_vertical_reverse = (new_direction[1] + check_direction[1] == 0) and (new_direction[1] != 0)
+  def save_game(self):
+    """Writes a snapshot of the running game to the quicksave file."""
+    try:
+      data = snapshot.dumps(self.world, self.config.path.level)
+      os.makedirs(self.config.path.saves, exist_ok=True)
+      with open(self.save_path, "wb") as file:
+        file.write(data)
+    except (OSError, snapshot.SnapshotError) as e:
+      print(f"Error saving game: {e}")
+
+  def load_game(self):
+    """Resumes the game stored in the quicksave file, switching level if needed."""
+    try:
+      with open(self.save_path, "rb") as file:
+        data = file.read()
+      level = snapshot.snapshot_level(data)
+    except (OSError, snapshot.SnapshotError) as e:
+      print(f"Error loading saved game: {e}")
+      return
 
-          if not (is_horizontal_reverse or is_vertical_reverse) and len(self.direction_queue) < 2:
-            self.direction_queue.append(new_direction)
+    previous_level = self.config.path.level
+    self.config.path.level = level
+    try:
+      self.manager.change_state(PlayState(self.manager, self.config, data))
+    except snapshot.SnapshotError as e:
+      print(f"Error loading saved game: {e}")
+      self.config.path.level = previous_level
+
+  def toggle_video(self):
+    """Starts or stops recording the screen to a video in ``path.videos``."""
+    if self.video:
+      self.video.close(wait=False)
+      print(f"Saved video to {self.video.path} ({self.video.dropped} frames dropped).")
+      self.video = None
+      return
 
-  def _reload_level(self):
-    """Reloads *map.txt* and (optionally) the background image."""
-    self.map = Map(self.level_dir)
-    if self.map.is_wall(*self.snake.get_head()) or self.map.is_no_spawn(*self.snake.get_head()):
+    path = os.path.join(self.config.path.videos, time.strftime(f"{self.config.path.level}-%Y%m%d-%H%M%S.mp4"))
+    try:
+      self.video = VideoExporter(path, self.screen.get_size(), self.config.game.speed, drop=True)
+    except RuntimeError as e:
+      print(f"Error starting video capture: {e}")
+
+  def _reload_level(self) -> bool:
+    """Reloads *map.txt* and (optionally) the background image.
+
+    Returns True if a player died in the reload and the level was restarted.
+    """
+    start = time.perf_counter()
+    self.map = Map(self.level_dir, previous=self.map)
+    killed = self.world.set_map(self.map)
+    self._emit("reload", killed=[snake.id for snake in killed])
+    if any(not snake.bot for snake in killed):
+      self._end_reason = "reload"
       self.manager.change_state(PlayState(self.manager, self.config))
-      return
+      return True
 
     self.renderer = Renderer(
       self.screen,
@@ -192,104 +320,70 @@ class PlayState(GameState):
       self.map.width,
       self.map.height,
       self.map.get_skip_segments(),
+      self.manager.image_cache,
     )
 
-    bg_path = os.path.join(self.level_dir, "background.png")
-    if os.path.exists(bg_path):
-      try:
-        image = pygame.image.load(bg_path).convert()
-        self.background_image = pygame.transform.scale(image, (self.manager.width, self.manager.height))
-      except pygame.error as e:
-        print(f"Error re-loading background image: {e}")
+    self._load_background()
+
+    elapsed = time.perf_counter() - start
+    metrics.MAP_RELOAD_SECONDS.observe(elapsed)
+    self._emit("reload_done", ms=round(elapsed * 1000, 2))
+    return False
 
   def update(self):
     if self._reload_needed:
       self._reload_needed = False
-      self._reload_level()
-
-    if self.direction_queue:
-      self.snake.direction = self.direction_queue.pop(0)
-
-    head_x, head_y = self.snake.get_head()
-    dx, dy = self.snake.direction
-    new_x, new_y = head_x + dx, head_y + dy
-
-    if new_x < 0:
-      new_x = self.map.width - 1
-    elif new_x >= self.map.width:
-      new_x = 0
-    if new_y < 0:
-      new_y = self.map.height - 1
-    elif new_y >= self.map.height:
-      new_y = 0
-
-    scan_count = 0
-    max_scan = max(self.map.width, self.map.height)
-
-    while (self.map.is_wall(new_x, new_y) or self.map.is_no_spawn(new_x, new_y)) and scan_count < max_scan:
-      new_x += dx
-      new_y += dy
-
-      if new_x < 0:
-        new_x = self.map.width - 1
-      if new_x >= self.map.width:
-        new_x = 0
-      if new_y < 0:
-        new_y = self.map.height - 1
-      if new_y >= self.map.height:
-        new_y = 0
-
-      scan_count += 1
-
-    if (
-      self.map.is_wall(new_x, new_y)
-      or self.map.is_no_spawn(new_x, new_y)
-      or self.snake.check_self_collision((new_x, new_y))
-    ):
-      self.manager.change_state(
-        FrozenGameOverState(self.manager, self.renderer, self.map, self.snake, self.food, self.score)
+      if self._reload_level():
+        # This state has been replaced by a restarted game.
+        return
+
+    self.replay.capture(self.world)
+    died = self.world.step()
+
+    if self.telemetry:
+      self._record_step(died)
+
+    # The game ends once every local player is dead, or every bot in a bots-only game.
+    contenders = self.players or self.world.snakes
+    if not any(snake.alive for snake in contenders):
+      self._end_reason = "death"
+      self.manager.change_state(FrozenGameOverState(self.manager, self.renderer, self.world))
+
+  def _record_step(self, died):
+    ticks = self.world.ticks
+    for snake in self.world.last_eaten:
+      self._emit(
+        "food",
+        snake=snake.id,
+        bot=snake.bot,
+        score=snake.score,
+        ticks_to_food=ticks - self._last_food_tick.get(snake.id, 0),
       )
-      return
+      self._last_food_tick[snake.id] = ticks
 
-    self.snake.move((new_x, new_y))
+    for snake in died:
+      self._emit("death", snake=snake.id, bot=snake.bot, cause=snake.death_cause, length=len(snake.body))
 
-    if (new_x, new_y) == self.food:
-      self.snake.grow()
-      self.score += 1
-      self.spawn_food()
+    if ticks % self.config.telemetry.sample_every == 0:
+      self._emit("length", lengths={snake.id: len(snake.body) for snake in self.players if snake.alive})
 
   def draw(self):
-    # Draw background
-    if self.background_image:
-      self.screen.blit(self.background_image, (0, 0))
-    else:
-      # Fallback to single color if image is not found or failed to load
-      self.screen.fill(self.config.colors.background)
-
-    # Draw grid
-    if self.config.grid.draw:
-      self.renderer.draw_grid(self.map.width, self.map.height)
-
-    # Draw walls
-    self.renderer.draw_walls(self.map.walls)
-
-    # Draw food
-    if self.food:
-      time_ms = pygame.time.get_ticks()
-      self.renderer.draw_food(self.food, time_ms)
+    start = time.perf_counter()
+    self.renderer.draw_world(self.world, pygame.time.get_ticks(), self.background_image)
+    metrics.DRAW_SECONDS.observe(time.perf_counter() - start)
 
-    # Draw snake
-    self.renderer.draw_snake(self.snake)
+    if self.video and not self.video.add_frame(self.screen) and self.video.failed:
+      # The encoder has already reported the error; stop recording.
+      self.video.close(wait=False)
+      self.video = None
 
 
 class FrozenGameOverState(GameState):
-  def __init__(self, manager, renderer, map_obj, snake, food, score):
+  def __init__(self, manager, renderer, world):
     super().__init__(manager)
     self.renderer = renderer
-    self.map = map_obj
-    self.snake = snake
-    self.food = food
-    self.score = score
+    self.world = world
+    self.map = world.map
     self.title_font = pygame.font.SysFont("Arial", 48)
     self.sub_font = pygame.font.SysFont("Arial", 32)
     self.last_update_time = pygame.time.get_ticks()
@@ -317,10 +411,10 @@ class FrozenGameOverState(GameState):
     self.renderer.draw_walls(self.map.walls)
 
     # Draw food
-    if self.food:
+    for food in self.world.foods:
       # Keep the frame of the food at the moment of death
       # To prevent animated food from moving, we pass the stored death time
-      self.renderer.draw_food(self.food, self.last_update_time)
+      self.renderer.draw_food(food, self.last_update_time)
 
-    # Draw snake
-    self.renderer.draw_snake(self.snake)
+    # Draw snakes, keeping the dead players where they crashed
+    self.renderer.draw_snakes([snake for snake in self.world.snakes if snake.alive or not snake.bot])
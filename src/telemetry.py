@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import gzip
+import json
+import queue
+import threading
+import time
+from pathlib import Path
+
+__all__ = ["TelemetryWriter"]
+
+# Marker put on the queue to wake the writer thread early.
+_WAKE = object()
+
+
+class TelemetryWriter:
+  """Writes gameplay events to rotating, gzip-compressed JSONL files off the game thread.
+
+  The game thread only calls :meth:`emit`, which never blocks: events go into
+  a bounded queue and a background thread writes them in batches. When the
+  queue is full, ``drop_policy`` decides what is lost: ``"newest"`` discards
+  the incoming event, ``"oldest"`` evicts the oldest queued one. Dropped
+  events are counted and reported as a ``dropped`` record in the output.
+  """
+
+  def __init__(
+    self,
+    directory: str | Path,
+    queue_size: int = 4096,
+    batch_size: int = 256,
+    flush_interval: float = 1.0,
+    max_bytes: int = 1_000_000,
+    max_files: int = 20,
+    drop_policy: str = "newest",
+  ):
+    if drop_policy not in ("newest", "oldest"):
+      raise ValueError(f"Unknown telemetry drop policy '{drop_policy}'.")
+
+    self._directory = Path(directory)
+    self._directory.mkdir(parents=True, exist_ok=True)
+    self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    self._batch_size = batch_size
+    self._flush_interval = flush_interval
+    self._max_bytes = max_bytes
+    self._max_files = max_files
+    self._drop_policy = drop_policy
+
+    self._dropped = 0
+    self._dropped_pending = 0
+    self._dropped_lock = threading.Lock()
+    self._flush_requested = threading.Event()
+    self._flush_waiters: list[threading.Event] = []
+    self._flush_lock = threading.Lock()
+    self._stop_requested = threading.Event()
+
+    self._file = None
+    self._file_bytes = 0
+    self._file_index = 0
+    self._prefix = time.strftime("telemetry-%Y%m%d-%H%M%S")
+
+    self._thread = threading.Thread(target=self._run, name="TelemetryWriter", daemon=True)
+    self._thread.start()
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, exc_type, exc, tb):
+    self.close()
+
+  @property
+  def dropped(self) -> int:
+    """Number of events discarded so far because the queue was full."""
+    return self._dropped
+
+  def emit(self, event: str, **fields):
+    """Queues an event without blocking. Safe to call from any thread."""
+    record = {"event": event, "time": time.time(), **fields}
+    try:
+      self._queue.put_nowait(record)
+      return
+    except queue.Full:
+      pass
+
+    if self._drop_policy == "oldest":
+      try:
+        evicted = self._queue.get_nowait()
+      except queue.Empty:
+        evicted = _WAKE
+      try:
+        self._queue.put_nowait(record)
+      except queue.Full:
+        evicted = record
+      if evicted is _WAKE:
+        return
+
+    with self._dropped_lock:
+      self._dropped += 1
+      self._dropped_pending += 1
+
+  def flush(self, timeout: float | None = None) -> bool:
+    """Asks the writer to push everything queued so far to disk, e.g. at the end of a run.
+
+    With a *timeout*, waits up to that long for the data to be written and
+    returns whether it was; otherwise returns immediately.
+    """
+    written = threading.Event()
+    with self._flush_lock:
+      self._flush_waiters.append(written)
+      self._flush_requested.set()
+    self._wake()
+    if timeout is None:
+      return False
+    return written.wait(timeout)
+
+  def close(self, timeout: float = 2.0):
+    """Writes out all queued events, closes the current file and stops the thread."""
+    self._stop_requested.set()
+    self._wake()
+    self._thread.join(timeout=timeout)
+
+  def _wake(self):
+    # The writer also wakes up on its own every *flush_interval*, so losing
+    # this marker to a full queue only delays the request.
+    try:
+      self._queue.put_nowait(_WAKE)
+    except queue.Full:
+      pass
+
+  # --- Background thread -----------------------------------------------------
+
+  def _run(self):
+    batch = []
+    deadline = time.monotonic() + self._flush_interval
+
+    while not self._stop_requested.is_set():
+      try:
+        item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+        if item is not _WAKE:
+          batch.append(item)
+      except queue.Empty:
+        pass
+
+      if self._flush_requested.is_set():
+        # Everything emitted before flush() was called is queued by now.
+        with self._flush_lock:
+          waiters, self._flush_waiters = self._flush_waiters, []
+          self._flush_requested.clear()
+        self._write(self._drain(batch))
+        batch = []
+        if self._file is not None:
+          self._file.flush()
+        for written in waiters:
+          written.set()
+        deadline = time.monotonic() + self._flush_interval
+      elif time.monotonic() >= deadline:
+        self._write(batch)
+        batch = []
+        if self._file is not None:
+          self._file.flush()
+        deadline = time.monotonic() + self._flush_interval
+      elif len(batch) >= self._batch_size:
+        self._write(batch)
+        batch = []
+
+    # End of run: drain whatever is still queued.
+    with self._flush_lock:
+      waiters, self._flush_waiters = self._flush_waiters, []
+    self._write(self._drain(batch))
+    if self._file is not None:
+      self._file.close()
+      self._file = None
+    for written in waiters:
+      written.set()
+
+  def _drain(self, batch):
+    while True:
+      try:
+        item = self._queue.get_nowait()
+      except queue.Empty:
+        return batch
+      if item is not _WAKE:
+        batch.append(item)
+
+  def _write(self, batch):
+    with self._dropped_lock:
+      dropped, self._dropped_pending = self._dropped_pending, 0
+    if dropped:
+      batch.append({"event": "dropped", "time": time.time(), "count": dropped})
+    if not batch:
+      return
+
+    data = "".join(json.dumps(record, separators=(",", ":")) + "\n" for record in batch).encode("utf-8")
+    if self._file is None or self._file_bytes + len(data) > self._max_bytes:
+      self._rotate()
+    self._file.write(data)
+    self._file_bytes += len(data)
+
+  def _rotate(self):
+    if self._file is not None:
+      self._file.close()
+
+    self._file_index += 1
+    path = self._directory / f"{self._prefix}-{self._file_index:04d}.jsonl.gz"
+    # Kept open across batches and closed on rotation or shutdown.
+    self._file = gzip.open(path, "wb")  # noqa: SIM115
+    self._file_bytes = 0
+
+    # Keep only the newest *max_files* files.
+    files = sorted(self._directory.glob("telemetry-*.jsonl.gz"))
+    for old in files[: max(0, len(files) - self._max_files)]:
+      try:
+        old.unlink()
+      except OSError:
+        pass
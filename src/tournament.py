@@ -0,0 +1,262 @@
+"""Headless bot tournament across every level.
+
+Plays complete games without a display, spread over a process pool, and
+aggregates scores, survival and simulation speed per level and policy::
+
+    python -m src.tournament --games 200 --policies greedy,random
+
+Finished games are appended to a JSONL results file as they complete, so an
+interrupted run picks up where it stopped when started again with the same
+file. Each record carries the settings it was played with; only games played
+with the current settings are resumed and reported.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import zlib
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from functools import cache
+
+from src.bots import resolve_policy
+from src.map import Map
+from src.utils import load_config, load_levels
+from src.world import World
+
+__all__ = ["main", "play_game", "summarize"]
+
+
+@cache
+def _load_map(level_dir: str) -> Map:
+  # Each worker process parses a level once; World never mutates its Map.
+  return Map(level_dir)
+
+
+def _game_seed(base_seed: int, level: str, policy: str, index: int) -> int:
+  return zlib.crc32(f"{base_seed}:{level}:{policy}:{index}".encode())
+
+
+def play_game(
+  directory: str,
+  level: str,
+  policy: str,
+  index: int,
+  seed: int,
+  width: int,
+  food: int,
+  opponents: int,
+  max_ticks: int,
+) -> dict:
+  """Plays one complete game with *policy* and returns its result record."""
+  map_obj = _load_map(os.path.join(directory, level))
+  world = World(map_obj, width, food, seed)
+  snake = world.add_snake(map_obj.start_pos, resolve_policy(policy))
+  for _ in range(opponents):
+    world.add_snake(policy=resolve_policy("greedy"))
+  world.spawn_food()
+
+  start = time.perf_counter()
+  while snake.alive and world.ticks < max_ticks:
+    world.step()
+  seconds = time.perf_counter() - start
+
+  return {
+    "level": level,
+    "policy": policy,
+    "index": index,
+    "seed": seed,
+    "score": snake.score,
+    "length": len(snake.body),
+    "ticks": world.ticks,
+    "cause": snake.death_cause or "timeout",
+    "seconds": seconds,
+  }
+
+
+def _read_results(path: str) -> list[dict]:
+  results = []
+  try:
+    with open(path, "r", encoding="utf-8") as file:
+      for line in file:
+        try:
+          results.append(json.loads(line))
+        except json.JSONDecodeError:
+          # A run killed mid-write can leave a partial last line.
+          pass
+  except FileNotFoundError:
+    pass
+  return results
+
+
+def _percentile(values: list[float], fraction: float) -> float:
+  ordered = sorted(values)
+  return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def summarize(results: list[dict]) -> dict:
+  """Aggregates game results per ``level/policy`` and per policy over all levels."""
+  groups: dict[str, list[dict]] = {}
+  for result in results:
+    groups.setdefault(f"{result['level']}/{result['policy']}", []).append(result)
+    groups.setdefault(f"*/{result['policy']}", []).append(result)
+
+  report = {}
+  for key, games in sorted(groups.items()):
+    scores = [game["score"] for game in games]
+    ticks = [game["ticks"] for game in games]
+    seconds = sum(game["seconds"] for game in games)
+    causes: dict[str, int] = {}
+    for game in games:
+      causes[game["cause"]] = causes.get(game["cause"], 0) + 1
+    report[key] = {
+      "games": len(games),
+      "score_mean": statistics.fmean(scores),
+      "score_p50": _percentile(scores, 0.5),
+      "score_p90": _percentile(scores, 0.9),
+      "score_max": max(scores),
+      "ticks_mean": statistics.fmean(ticks),
+      "ticks_p50": _percentile(ticks, 0.5),
+      "steps_per_second": sum(ticks) / seconds if seconds else 0.0,
+      "causes": causes,
+    }
+  return report
+
+
+def _print_report(report: dict):
+  print(f"{'level/policy':<24} {'games':>6} {'score':>7} {'p50':>5} {'p90':>5} {'max':>5} {'ticks':>8} {'steps/s':>10}")
+  for key, row in report.items():
+    print(
+      f"{key:<24} {row['games']:>6} {row['score_mean']:>7.2f} {row['score_p50']:>5} {row['score_p90']:>5}"
+      f" {row['score_max']:>5} {row['ticks_mean']:>8.1f} {row['steps_per_second']:>10.0f}"
+    )
+
+
+def _parse_args(argv):
+  parser = argparse.ArgumentParser(description="Play headless bot games across all levels.")
+  parser.add_argument("--config", default="config.yaml", help="config file for the level directory and snake width")
+  parser.add_argument("--games", type=int, default=100, help="games per level and policy")
+  parser.add_argument("--policies", default="greedy", help="comma separated policy names or module:function paths")
+  parser.add_argument("--levels", help="comma separated levels (default: every level in levels.txt)")
+  parser.add_argument("--opponents", type=int, default=0, help="greedy bots added to every game")
+  parser.add_argument("--food", type=int, default=1, help="food on the map at once")
+  parser.add_argument("--max-ticks", type=int, default=10_000, help="end a game after this many ticks")
+  parser.add_argument("--seed", type=int, default=0, help="base seed; game seeds are derived from it")
+  parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+  parser.add_argument("--results", default="tournament.jsonl", help="results file, appended to and resumed from")
+  parser.add_argument("--report", help="also write the aggregated report to this JSON file")
+  args = parser.parse_args(argv)
+
+  # Fail fast on a typo before starting any workers.
+  for policy in args.policies.split(","):
+    try:
+      resolve_policy(policy)
+    except (ValueError, ImportError, AttributeError) as e:
+      parser.error(f"invalid policy '{policy}': {e}")
+  return args
+
+
+def main(argv=None):
+  args = _parse_args(argv)
+  config = load_config(args.config)
+  if not config:
+    return 1
+
+  directory = config.path.directory
+  levels = args.levels.split(",") if args.levels else load_levels(directory)
+  policies = args.policies.split(",")
+
+  settings = {
+    "seed": args.seed,
+    "width": config.game.width,
+    "food": args.food,
+    "opponents": args.opponents,
+    "max_ticks": args.max_ticks,
+  }
+  wanted = {(level, policy, index) for level in levels for policy in policies for index in range(args.games)}
+  results = []
+  done = set()
+  for result in _read_results(args.results):
+    key = (result["level"], result["policy"], result["index"])
+    if result.get("settings") == settings and key in wanted and key not in done:
+      results.append(result)
+      done.add(key)
+  pending = [
+    (level, policy, index)
+    for level in levels
+    for policy in policies
+    for index in range(args.games)
+    if (level, policy, index) not in done
+  ]
+  if results:
+    print(f"Resuming: {len(results)} games already played, {len(pending)} to go.")
+
+  workers = args.workers or os.process_cpu_count() or 1
+  started = time.perf_counter()
+  finished = 0
+
+  with open(args.results, "a", encoding="utf-8") as out, ProcessPoolExecutor(max_workers=workers) as pool:
+    # Keep a bounded number of games in flight so thousands of games don't
+    # all sit in the executor's queue at once.
+    queue = iter(pending)
+    in_flight = set()
+
+    def _submit(count):
+      for level, policy, index in queue:
+        seed = _game_seed(args.seed, level, policy, index)
+        in_flight.add(
+          pool.submit(
+            play_game,
+            directory,
+            level,
+            policy,
+            index,
+            seed,
+            config.game.width,
+            args.food,
+            args.opponents,
+            args.max_ticks,
+          )
+        )
+        count -= 1
+        if count == 0:
+          return
+
+    try:
+      _submit(workers * 4)
+      while in_flight:
+        completed, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+        for future in completed:
+          result = future.result()
+          result["settings"] = settings
+          out.write(json.dumps(result) + "\n")
+          results.append(result)
+          finished += 1
+          print(
+            f"[{finished}/{len(pending)}] {result['level']}/{result['policy']} #{result['index']}: "
+            f"score {result['score']}, {result['ticks']} ticks, {result['cause']}"
+          )
+        out.flush()
+        _submit(len(completed))
+    except KeyboardInterrupt:
+      print("Interrupted; finished games are saved and will be skipped on the next run.")
+      pool.shutdown(wait=False, cancel_futures=True)
+      return 130
+
+  elapsed = time.perf_counter() - started
+  print(f"Played {finished} games in {elapsed:.1f}s on {workers} workers.")
+
+  report = summarize(results)
+  _print_report(report)
+  if args.report:
+    with open(args.report, "w", encoding="utf-8") as file:
+      json.dump(report, file, indent=2)
+  return 0
+
+
+if __name__ == "__main__":
+  sys.exit(main())
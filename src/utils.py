@@ -1,4 +1,5 @@
-from typing import Optional
+import os
+from typing import Literal, Optional
 
 import yaml
 from pydantic import BaseModel, ValidationError
@@ -23,16 +24,47 @@ class ColorsSettings(BaseModel):
   snake: str
   wall: str
   text: str
+  bot: str = "soft-blue"
 
 
 class PathSettings(BaseModel):
   directory: str
   level: str
+  saves: str = "saves"
+  replays: str = "replays"
+  videos: str = "videos"
 
 
 class GameSettings(BaseModel):
   speed: int
   width: int
+  players: int = 1
+  bots: int = 0
+  food: int = 1
+
+
+class TelemetrySettings(BaseModel):
+  enabled: bool = False
+  directory: str = "telemetry"
+  queue_size: int = 4096
+  batch_size: int = 256
+  max_bytes: int = 1_000_000
+  max_files: int = 20
+  drop_policy: Literal["newest", "oldest"] = "newest"
+  sample_every: int = 6
+
+
+class CacheSettings(BaseModel):
+  enabled: bool = True
+  directory: str = ".cache/images"
+  max_entries: int = 128
+
+
+class MetricsSettings(BaseModel):
+  enabled: bool = False
+  host: str = "127.0.0.1"
+  port: int = 9464
+  unix_socket: str | None = None
 
 
 class Config(BaseModel):
@@ -42,6 +74,9 @@ class Config(BaseModel):
   wall: float
   path: PathSettings
   game: GameSettings
+  telemetry: TelemetrySettings = TelemetrySettings()
+  cache: CacheSettings = CacheSettings()
+  metrics: MetricsSettings = MetricsSettings()
 
 
 def load_config(path: str = "config.yaml") -> Optional[Config]:
@@ -78,3 +113,12 @@ def load_config(path: str = "config.yaml") -> Optional[Config]:
 
   # Something went wrong – signal failure to caller
   return None
+
+
+def load_levels(directory: str) -> list[str]:
+  """Return the level names listed in ``<directory>/levels.txt``, or an empty list if it is missing."""
+  try:
+    with open(os.path.join(directory, "levels.txt"), "r", encoding="utf-8") as file:
+      return [line.strip() for line in file if line.strip()]
+  except FileNotFoundError:
+    return []
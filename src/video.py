@@ -0,0 +1,213 @@
+"""Video and animated GIF export, encoded off the game thread.
+
+Frames are copied out of a Surface as raw RGB buffers into a bounded queue.
+A worker thread streams them into an ``ffmpeg`` process, which encodes to
+whatever the output extension asks for (``.mp4``, ``.webm``, ``.gif``...), so
+memory use does not grow with the length of the game. Requires ``ffmpeg`` on
+the PATH.
+
+Recorded games can be exported headlessly, faster than real time::
+
+    python -m src.video replays/last.snkr highlight.gif
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import queue
+import shutil
+import subprocess
+import sys
+import threading
+import time
+
+import pygame
+
+from src.image_cache import ImageCache
+from src.map import Map
+from src.renderer import Renderer
+from src.replay import Replay
+from src.utils import load_config
+
+__all__ = ["VideoExporter", "export_replay", "main"]
+
+_STOP = object()
+
+
+class VideoExporter:
+  """Streams frames of a fixed *size* to *path* through a background ffmpeg encoder.
+
+  With ``drop=True`` (for live capture) :meth:`add_frame` never blocks and
+  frames that do not fit in the queue are dropped; otherwise the caller
+  waits for the encoder, which is what offline export wants. If ffmpeg
+  fails, :attr:`failed` is set and further frames are refused.
+  """
+
+  def __init__(self, path: str, size: tuple[int, int], fps: int, queue_size: int = 32, drop: bool = False):
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+      raise RuntimeError("ffmpeg was not found on the PATH; it is needed to export videos.")
+
+    self.path = path
+    self.size = size
+    self.drop = drop
+    self.frames = 0
+    self.dropped = 0
+    self.failed = False
+
+    directory = os.path.dirname(path)
+    if directory:
+      os.makedirs(directory, exist_ok=True)
+
+    command = [ffmpeg, "-loglevel", "error", "-y"]
+    command += ["-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{size[0]}x{size[1]}", "-r", str(fps), "-i", "-"]
+    if path.lower().endswith(".gif"):
+      # A fresh palette per frame keeps GIF encoding streaming instead of
+      # buffering the whole video for a global palette.
+      command += ["-vf", "split[a][b];[a]palettegen=stats_mode=single[p];[b][p]paletteuse=new=1"]
+    else:
+      command += ["-pix_fmt", "yuv420p"]
+    command.append(path)
+
+    self._process = subprocess.Popen(command, stdin=subprocess.PIPE)
+    self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    self._closing = threading.Event()
+    self._thread = threading.Thread(target=self._run, name="VideoExporter")
+    self._thread.start()
+
+  def add_frame(self, surface: pygame.Surface) -> bool:
+    """Captures *surface* as the next frame. Returns False if it was dropped or the encoder failed."""
+    if self.failed:
+      return False
+    if surface.get_size() != self.size:
+      surface = pygame.transform.scale(surface, self.size)
+    frame = pygame.image.tobytes(surface, "RGB")
+
+    if self.drop:
+      try:
+        self._queue.put_nowait(frame)
+      except queue.Full:
+        self.dropped += 1
+        return False
+    else:
+      # The worker keeps draining the queue even after a failure, so this
+      # cannot block forever.
+      self._queue.put(frame)
+    self.frames += 1
+    return True
+
+  def close(self, wait: bool = True):
+    """Finishes the file once all queued frames are encoded.
+
+    Never blocks unless *wait* is set. With ``wait=False`` the encoder
+    finishes in the background; the interpreter still waits for it before
+    exiting.
+    """
+    self._closing.set()
+    try:
+      self._queue.put_nowait(_STOP)
+    except queue.Full:
+      # The worker stops by itself once it has emptied the queue.
+      pass
+    if wait:
+      self._thread.join()
+
+  def _run(self):
+    stdin = self._process.stdin
+    while True:
+      frame = self._queue.get()
+      if frame is _STOP:
+        break
+      if not self.failed:
+        try:
+          stdin.write(frame)
+        except OSError:
+          self.failed = True
+          print(f"Error: ffmpeg stopped while exporting '{self.path}'.")
+      if self._closing.is_set() and self._queue.empty():
+        break
+
+    try:
+      stdin.close()
+    except OSError:
+      pass
+    if self._process.wait() != 0 and not self.failed:
+      self.failed = True
+      print(f"Error: ffmpeg failed to export '{self.path}'.")
+
+
+def export_replay(replay_path: str, output: str, config, fps: int | None = None, max_ticks: int | None = None) -> int:
+  """Renders a replay headlessly to *output* and returns the number of frames written."""
+  replay = Replay.load(replay_path)
+  level_dir = os.path.join(config.path.directory, replay.level)
+  map_obj = Map(level_dir)
+  speed = config.game.speed
+
+  size = (config.window.width, config.window.height)
+  surface = pygame.Surface(size)
+  image_cache = ImageCache(config.cache.directory if config.cache.enabled else None, config.cache.max_entries)
+  renderer = Renderer(
+    surface,
+    config,
+    config.grid.width,
+    config.grid.height,
+    map_obj.width,
+    map_obj.height,
+    map_obj.get_skip_segments(),
+    image_cache,
+  )
+
+  background = None
+  background_path = os.path.join(level_dir, "background.png")
+  if os.path.exists(background_path):
+    background = image_cache.load_scaled(background_path, size)
+
+  exporter = VideoExporter(output, size, fps or speed)
+  try:
+    for world in replay.play(map_obj, max_ticks):
+      # Animate food on the game clock rather than wall time.
+      renderer.draw_world(world, world.ticks * 1000 // speed, background)
+      if not exporter.add_frame(surface):
+        break
+  finally:
+    exporter.close()
+  if exporter.failed:
+    raise RuntimeError(f"could not export '{output}', ffmpeg failed after {exporter.frames} frames.")
+  return exporter.frames
+
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(description="Export a recorded game as a video or animated GIF.")
+  parser.add_argument("replay", help="replay file, e.g. replays/last.snkr")
+  parser.add_argument("output", help="output file; the extension picks the format (.mp4, .webm, .gif)")
+  parser.add_argument("--config", default="config.yaml")
+  parser.add_argument("--fps", type=int, help="frames per second (default: game speed)")
+  parser.add_argument("--max-ticks", type=int, help="stop after this many ticks")
+  args = parser.parse_args(argv)
+
+  config = load_config(args.config)
+  if not config:
+    return 1
+
+  # Render without opening a window; a display mode is still needed for convert().
+  os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+  pygame.init()
+  pygame.font.init()
+  pygame.display.set_mode((1, 1))
+
+  began = time.perf_counter()
+  try:
+    frames = export_replay(args.replay, args.output, config, args.fps, args.max_ticks)
+  except RuntimeError as e:
+    print(f"Error: {e}")
+    return 1
+  finally:
+    pygame.quit()
+  elapsed = time.perf_counter() - began
+  print(f"Wrote {frames} frames to {args.output} in {elapsed:.1f}s ({frames / max(elapsed, 1e-9):.0f} fps).")
+  return 0
+
+
+if __name__ == "__main__":
+  sys.exit(main())
@@ -0,0 +1,233 @@
+import random
+from collections.abc import Callable
+
+from src import metrics
+from src.map import Map
+from src.occupancy import EMPTY, OccupancyGrid
+from src.snake import Snake
+
+__all__ = ["Policy", "World"]
+
+# A bot policy receives the world and the snake it controls and returns the
+# direction to move in, or *None* to keep the current one.
+Policy = Callable[["World", Snake], tuple[int, int] | None]
+
+
+class World:
+  """The game simulation: a map, every snake on it, the food and a shared occupancy grid.
+
+  ``World`` does not depend on pygame so it can be stepped headlessly.
+  Seeds are unsigned 32-bit integers so snapshots can store them.
+  """
+
+  def __init__(self, map_obj: Map, start_width: int, food_count: int = 1, seed: int | None = None):
+    if seed is not None and not 0 <= seed < 2**32:
+      raise ValueError(f"World seed must be between 0 and {2**32 - 1}, got {seed}.")
+    self.map = map_obj
+    self.start_width = start_width
+    self.food_count = max(1, food_count)
+    self.seed = seed if seed is not None else random.randrange(2**32)
+    self.rng = random.Random(self.seed)
+    self.snakes: list[Snake] = []
+    self.policies: dict[int, Policy] = {}
+    self.foods: set[tuple[int, int]] = set()
+    self.grid = OccupancyGrid(self.map.width, self.map.height)
+    self.ticks = 0
+    # Only the real game updates the engine metrics; forks used for lookahead do not.
+    self.record_metrics = True
+    # Snakes that ate during the last step, in the order they ate.
+    self.last_eaten: list[Snake] = []
+    # (component index, component ids, cells) behind spawn_cells().
+    self._spawn_cache = (None, frozenset(), [])
+
+  def fork(self) -> "World":
+    """Returns a copy of the world that can be stepped independently.
+
+    The map and the policies are shared; only the small mutable parts are
+    copied. Dead snakes never change again, so they are shared as well.
+    """
+    clone = World.__new__(World)
+    clone.__dict__.update(self.__dict__)
+    clone.rng = random.Random()
+    clone.rng.setstate(self.rng.getstate())
+    clone.snakes = [snake.copy() if snake.alive else snake for snake in self.snakes]
+    clone.policies = self.policies.copy()
+    clone.foods = self.foods.copy()
+    clone.grid = self.grid.copy()
+    clone.last_eaten = []
+    clone.record_metrics = False
+    return clone
+
+  def add_snake(self, start_pos=None, policy: Policy | None = None) -> Snake | None:
+    """Places a new snake on *start_pos*, or on a random free cell if that is taken.
+
+    Snakes with a *policy* are bots; the others are steered through their
+    ``direction_queue``. Returns *None* if there is no room left.
+    """
+    if start_pos is None or not self.is_free(start_pos):
+      start_pos = self.random_free_cell()
+      if start_pos is None:
+        return None
+
+    snake = Snake(start_pos, self.start_width, len(self.snakes), bot=policy is not None)
+    self.snakes.append(snake)
+    if policy is not None:
+      self.policies[snake.id] = policy
+    self.grid.occupy(start_pos, snake.id)
+    return snake
+
+  def alive_snakes(self) -> list[Snake]:
+    return [snake for snake in self.snakes if snake.alive]
+
+  def is_free(self, pos) -> bool:
+    return not self.map.is_blocked(*pos) and self.grid.is_free(pos) and pos not in self.foods
+
+  def spawn_cells(self) -> list[tuple[int, int]]:
+    """Returns the cells the live snakes can reach, or the largest region if there are none.
+
+    Spawning only from these keeps food and new snakes out of pockets that
+    can never be entered.
+    """
+    components = self.map.components
+    key = frozenset(components.component_at(*snake.get_head()) for snake in self.snakes if snake.alive)
+    if not key:
+      key = frozenset((0,)) if len(components) else frozenset()
+
+    cached_components, cached_key, cells = self._spawn_cache
+    if cached_components is not components or cached_key != key:
+      cells = [cell for component in sorted(key) for cell in components.cells[component]]
+      self._spawn_cache = (components, key, cells)
+    return cells
+
+  def random_free_cell(self):
+    """Picks a random reachable cell that holds no wall, snake or food.
+
+    Gives up and returns *None* after a bounded number of attempts so that a
+    full map cannot hang the game.
+    """
+    return self._sample_free_cell()[0]
+
+  def _sample_free_cell(self):
+    """Returns ``(cell or None, rejected attempts)`` for :meth:`random_free_cell`."""
+    cells = self.spawn_cells()
+    if not cells:
+      return None, 0
+
+    attempts = len(cells) * 4
+    for attempt in range(attempts):
+      pos = cells[self.rng.randrange(len(cells))]
+      if self.is_free(pos):
+        return pos, attempt
+    return None, attempts
+
+  def spawn_food(self):
+    while len(self.foods) < self.food_count:
+      pos, rejected = self._sample_free_cell()
+      if self.record_metrics:
+        metrics.FOOD_SPAWN_RETRIES.inc(rejected)
+      if pos is None:
+        return
+      self.foods.add(pos)
+
+  def set_map(self, map_obj: Map) -> list[Snake]:
+    """Swaps in a reloaded map and rebuilds the occupancy grid.
+
+    Snakes left on a blocked or out of range cell are killed and returned.
+    """
+    self.map = map_obj
+    self.grid = OccupancyGrid(map_obj.width, map_obj.height)
+
+    def _valid(pos):
+      return 0 <= pos[0] < map_obj.width and 0 <= pos[1] < map_obj.height and not map_obj.is_blocked(*pos)
+
+    killed = []
+    for snake in self.snakes:
+      if not snake.alive:
+        continue
+      if not all(_valid(pos) for pos in snake.body):
+        self._kill(snake, "reload")
+        killed.append(snake)
+        continue
+      for pos in snake.body:
+        self.grid.occupy(pos, snake.id)
+
+    self.foods = {pos for pos in self.foods if _valid(pos) and self.grid.is_free(pos)}
+    self.spawn_food()
+    return killed
+
+  def _kill(self, snake: Snake, cause: str):
+    snake.alive = False
+    snake.death_cause = cause
+    for pos in snake.body:
+      self.grid.release(pos, snake.id)
+
+  def step(self) -> list[Snake]:
+    """Advances every live snake by one cell and returns the snakes that died.
+
+    All snakes move simultaneously. Tails that are about to move are released
+    first, then each new head is resolved with a single grid lookup: two heads
+    on one cell kill both (so neither gets a contested food), a head on any
+    body kills that snake.
+    """
+    self.ticks += 1
+    self.last_eaten = []
+    moves = []
+    dying = []
+    scans = 0
+
+    for snake in self.snakes:
+      if not snake.alive:
+        continue
+
+      policy = self.policies.get(snake.id)
+      if policy is not None:
+        direction = policy(self, snake)
+        if direction:
+          snake.direction = direction
+      elif snake.direction_queue:
+        snake.direction = snake.direction_queue.pop(0)
+
+      if snake.grow_pending == 0:
+        self.grid.release(snake.body[-1], snake.id)
+
+      new_head, scan_count = self.map.next_cell(snake.get_head(), snake.direction)
+      scans += scan_count
+      if self.map.is_blocked(*new_head):
+        dying.append((snake, "wall"))
+      else:
+        moves.append((snake, new_head))
+
+    if self.record_metrics:
+      metrics.TICKS.inc()
+      metrics.WALL_SKIP_SCANS.inc(scans)
+
+    heads: dict[tuple[int, int], int] = {}
+    for _, new_head in moves:
+      heads[new_head] = heads.get(new_head, 0) + 1
+
+    survivors = []
+    for snake, new_head in moves:
+      owner = self.grid.owner(new_head)
+      if heads[new_head] > 1:
+        dying.append((snake, "head"))
+      elif owner == snake.id:
+        dying.append((snake, "self"))
+      elif owner != EMPTY:
+        dying.append((snake, "snake"))
+      else:
+        survivors.append((snake, new_head))
+
+    for snake, cause in dying:
+      self._kill(snake, cause)
+
+    for snake, new_head in survivors:
+      snake.move(new_head)
+      self.grid.occupy(new_head, snake.id)
+      if new_head in self.foods:
+        self.foods.discard(new_head)
+        snake.grow()
+        snake.score += 1
+        self.last_eaten.append(snake)
+
+    self.spawn_food()
+    return [snake for snake, _ in dying]